@@ -1,5 +1,6 @@
+from django import forms
 from django.contrib import admin
-from .models import Movie, Show, Booking
+from .models import Movie, Show, Booking, BookingArchive, SeatHold, SeatLayout
 
 
 @admin.register(Movie)
@@ -10,7 +11,8 @@ class MovieAdmin(admin.ModelAdmin):
 
 @admin.register(Show)
 class ShowAdmin(admin.ModelAdmin):
-    list_display = ("movie", "screen_name", "date_time", "total_seats")
+    list_display = ("movie", "screen_name", "date_time", "layout", "total_seats", "booked_count")
+    readonly_fields = ("booked_count",)
     list_filter = ("screen_name", "date_time", "movie")
     search_fields = ("movie__title", "screen_name")
     date_hierarchy = "date_time"
@@ -21,3 +23,55 @@ class BookingAdmin(admin.ModelAdmin):
     list_display = ("user", "show", "seat_number", "status", "created_at")
     list_filter = ("status", "created_at", "show__movie")
     search_fields = ("user__username", "show__movie__title")
+
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    list_display = ("user", "show", "seat_number", "expires_at")
+    search_fields = ("user__username", "show__movie__title")
+
+
+@admin.register(BookingArchive)
+class BookingArchiveAdmin(admin.ModelAdmin):
+    list_display = ("user", "show", "seat_number", "status", "created_at", "archived_at")
+    list_filter = ("status", "archived_at")
+    search_fields = ("user__username", "show__movie__title")
+
+
+class SeatLayoutForm(forms.ModelForm):
+    blocked_seats = forms.CharField(
+        required=False, widget=forms.Textarea(attrs={"rows": 2}), help_text="Comma-separated, e.g. A1, A2, J10"
+    )
+
+    class Meta:
+        model = SeatLayout
+        fields = ("name", "rows", "seats_per_row")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields["blocked_seats"].initial = ", ".join(self.instance.blocked_labels())
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get("rows") and cleaned.get("seats_per_row"):
+            # checked against the submitted grid, which only reaches self.instance after clean()
+            layout = SeatLayout(rows=cleaned["rows"], seats_per_row=cleaned["seats_per_row"])
+            labels = [label for label in cleaned.get("blocked_seats", "").split(",") if label.strip()]
+            try:
+                layout.set_blocked(labels)
+                cleaned["blocked"] = layout.blocked
+            except ValueError as e:
+                self.add_error("blocked_seats", str(e))
+        return cleaned
+
+    def save(self, commit=True):
+        self.instance.blocked = self.cleaned_data["blocked"]
+        return super().save(commit)
+
+
+@admin.register(SeatLayout)
+class SeatLayoutAdmin(admin.ModelAdmin):
+    form = SeatLayoutForm
+    list_display = ("name", "rows", "seats_per_row", "capacity")
+    search_fields = ("name",)
@@ -0,0 +1,161 @@
+"""
+Native async views for the ASGI entry point (config/asgi.py).
+
+DRF views are sync-only, so under ASGI every request hops to a thread. These
+plain Django async views do their waiting on the event loop instead, using the
+async ORM (acount / aiterator / afirst), so one worker process can hold many
+slow clients. They live under /api/async/ and return the same JSON as their
+DRF counterparts; list endpoints use the page-number contract
+(count / next / previous / results).
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import claims_auth_enabled, user_from_claims
+from .models import Booking, Movie, Show
+from .seatmap import aget_seat_map
+from .serializers import BookingSerializer, MovieSerializer, ShowSerializer, request_paths, select_expanded
+
+User = get_user_model()
+
+
+async def _authenticate(request):
+    """JWT auth without a thread hop: token checks are CPU only, the user comes from claims (if enabled) or an afirst."""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw = auth.get_raw_token(header) if header else None
+    if raw is None:
+        return None
+    try:
+        token = auth.get_validated_token(raw)
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None
+    if claims_auth_enabled():
+        user = user_from_claims(token)
+        if user is not None:
+            return user
+    return await User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id, "is_active": True}).afirst()
+
+
+def _detail(message, status):
+    return JsonResponse({"detail": message}, status=status)
+
+
+def _positive_int(value, default, cutoff=None):
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return default
+    if n < 1:
+        return default
+    return min(n, cutoff) if cutoff else n
+
+
+async def _paginated(request, queryset, serializer_class, page_size=10, max_page_size=100):
+    """Page-number pagination over the async ORM: one acount, one sliced aiterator."""
+    page = _positive_int(request.GET.get("page"), 1)
+    size = _positive_int(request.GET.get("page_size"), page_size, max_page_size)
+    count = await queryset.acount()
+    offset = (page - 1) * size
+    if offset and offset >= count:
+        return _detail("Invalid page.", 404)
+
+    rows = [obj async for obj in queryset[offset:offset + size].aiterator()]
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, "page", page + 1) if offset + size < count else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, "page")
+    else:
+        previous_url = replace_query_param(url, "page", page - 1)
+
+    return JsonResponse({
+        "count": count,
+        "next": next_url,
+        "previous": previous_url,
+        "results": serializer_class(rows, many=True, context={"request": request}).data,
+    })
+
+
+@require_GET
+async def movie_list(request):
+    return await _paginated(request, Movie.objects.order_by("title", "id"), MovieSerializer)
+
+
+@require_GET
+async def movie_shows(request, movie_id):
+    if not await Movie.objects.filter(pk=movie_id).aexists():
+        return _detail("Not found.", 404)
+    qs = select_expanded(Show.objects.filter(movie_id=movie_id), ShowSerializer, request_paths(request, "expand"))
+    dt_from = request.GET.get("from")
+    if dt_from:
+        parsed = parse_datetime(dt_from)
+        if parsed:
+            qs = qs.filter(date_time__gte=parsed)
+    return await _paginated(request, qs.order_by("date_time", "id"), ShowSerializer)
+
+
+@require_GET
+async def seat_map(request, id):
+    data = await aget_seat_map(id)
+    if data is None:
+        return _detail("Not found.", 404)
+    return JsonResponse(data)
+
+
+@require_GET
+async def my_bookings(request):
+    user = await _authenticate(request)
+    if user is None:
+        return _detail("Authentication credentials were not provided.", 401)
+    qs = Booking.objects.filter(user=user).order_by("-created_at", "-id")
+    qs = select_expanded(qs, BookingSerializer, request_paths(request, "expand"))
+    return await _paginated(request, qs, BookingSerializer)
+
+
+@require_GET
+async def me(request):
+    user = await _authenticate(request)
+    if user is None:
+        return _detail("Authentication credentials were not provided.", 401)
+    return JsonResponse({"id": user.id, "username": user.username, "email": user.email})
+
+
+@csrf_exempt  # JWT in the Authorization header, not a cookie
+@require_POST
+async def book_seat(request, id):
+    """Async POST /api/shows/<id>/book/ — retries back off with asyncio.sleep."""
+    user = await _authenticate(request)
+    if user is None:
+        return _detail("Authentication credentials were not provided.", 401)
+
+    try:
+        seat_number = json.loads(request.body or b"{}").get("seat_number")
+    except (ValueError, AttributeError):
+        return _detail("invalid JSON body", 400)
+    if not isinstance(seat_number, str) or not seat_number or len(seat_number) > 10:
+        return _detail("seat_number required", 400)
+
+    expand = request_paths(request, "expand").get("show", {})
+    # the layout is needed to validate the seat, and can't be loaded lazily in async code
+    show = await select_expanded(Show.objects.select_related("layout").filter(pk=id), ShowSerializer, expand).afirst()
+    if show is None:
+        return _detail("Not found.", 404)
+
+    try:
+        booking = await Booking.acreate_booking(user=user, show=show, seat_number=seat_number)
+    except ValueError as e:
+        return _detail(str(e), 400)
+
+    return JsonResponse(BookingSerializer(booking, context={"request": request}).data, status=201)
@@ -0,0 +1,167 @@
+"""
+Opt-in JWT authentication without a user query per request.
+
+ClaimsJWTAuthentication (enable it in DEFAULT_AUTHENTICATION_CLASSES) builds
+request.user straight from the access token: tokens issued by
+/api/auth/login/ and /api/auth/token/refresh/ carry the user's username and
+email as claims, which is enough for ownership checks and for MeView. The user
+is a real User instance whose other fields are deferred, so it works as a
+foreign key value and any field a view does touch is loaded from the database
+on first access. Privileges are never taken from the token: views that need
+them use IsActiveStaff, which reads is_active / is_staff from the database.
+
+Refreshing re-reads the user (ClaimsTokenRefreshSerializer), so a deactivated
+user keeps access for at most ACCESS_TOKEN_LIFETIME.
+
+Tokens without those claims (issued by RefreshToken.for_user) fall back to an
+in-process cache of users keyed by id, kept for AUTH_USER_CACHE_TTL_SECONDS
+(at most AUTH_USER_CACHE_MAX_ENTRIES of them, least recently used dropped first).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme, TokenObtainPairSerializerExtension
+from drf_spectacular.contrib.rest_framework_simplejwt import TokenRefreshSerializerExtension
+from rest_framework import exceptions, permissions
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+User = get_user_model()
+
+# identity only: privilege flags always come from the database
+USER_CLAIMS = ("username", "email")
+
+_user_cache = OrderedDict()  # user id -> (expires_at, user), least recently used first
+_user_cache_lock = threading.Lock()
+
+
+def add_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def user_from_claims(token):
+    """User built from the token's claims with every other field deferred, or None if claims are missing."""
+    if jwt_settings.USER_ID_CLAIM not in token or any(claim not in token for claim in USER_CLAIMS):
+        return None
+    data = {claim: token[claim] for claim in USER_CLAIMS}
+    data[jwt_settings.USER_ID_FIELD] = token[jwt_settings.USER_ID_CLAIM]
+    # from_db takes the loaded fields in model field order
+    field_names = [f.attname for f in User._meta.concrete_fields if f.attname in data]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [data[name] for name in field_names])
+
+
+def load_full_user(user):
+    """Load every deferred field of a claims user in one query (a no-op for a fully loaded user)."""
+    deferred = user.get_deferred_fields()
+    if deferred:
+        user.refresh_from_db(fields=list(deferred))
+    return user
+
+
+def claims_auth_enabled():
+    return any(issubclass(cls, ClaimsJWTAuthentication) for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES)
+
+
+def clear_user_cache(user_id=None):
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(user_id, None)
+
+
+def _cache_user(user_id, entry):
+    """Store entry, evicting the least recently used users beyond AUTH_USER_CACHE_MAX_ENTRIES."""
+    limit = getattr(settings, "AUTH_USER_CACHE_MAX_ENTRIES", 1024)
+    with _user_cache_lock:
+        _user_cache[user_id] = entry
+        _user_cache.move_to_end(user_id)
+        while len(_user_cache) > limit:
+            _user_cache.popitem(last=False)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login serializer (SIMPLE_JWT["TOKEN_OBTAIN_SERIALIZER"]); refreshed access tokens copy the claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer (SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"]): unlike SimpleJWT's it
+    loads the user, refuses deleted or inactive ones, and writes their current claims.
+    """
+
+    def validate(self, attrs):
+        user_id = RefreshToken(attrs["refresh"]).get(jwt_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}).first()
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise exceptions.AuthenticationFailed("User is inactive or no longer exists.", code="user_inactive")
+        data = super().validate(attrs)
+        data["access"] = str(add_user_claims(AccessToken(data["access"]), user))
+        if "refresh" in data:
+            data["refresh"] = str(add_user_claims(RefreshToken(data["refresh"]), user))
+        return data
+
+
+class IsActiveStaff(permissions.BasePermission):
+    """IsAdminUser, checked against the database rather than whatever request.user carries."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        try:
+            load_full_user(user)  # no query for a user JWTAuthentication loaded
+        except User.DoesNotExist:
+            return False
+        return user.is_active and user.is_staff
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if not jwt_settings.CHECK_REVOKE_TOKEN:  # revocation needs the password hash from the database
+            user = user_from_claims(validated_token)
+            if user is not None:
+                return user
+        return self._cached_user(validated_token)
+
+    def _cached_user(self, validated_token):
+        ttl = getattr(settings, "AUTH_USER_CACHE_TTL_SECONDS", 30)
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        with _user_cache_lock:
+            entry = _user_cache.get(user_id)
+            if entry is not None:
+                _user_cache.move_to_end(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            user = super().get_user(validated_token)  # raises for unknown or inactive users
+            entry = (time.monotonic() + ttl, user)
+            if ttl > 0:
+                _cache_user(user_id, entry)
+        # each request gets its own copy, so views can't leak changes between requests
+        return copy.copy(entry[1])
+
+
+# OpenAPI: document both like their SimpleJWT base classes
+class ClaimsJWTScheme(SimpleJWTScheme):
+    target_class = "bookings.authentication.ClaimsJWTAuthentication"
+
+
+class ClaimsTokenObtainPairSerializerExtension(TokenObtainPairSerializerExtension):
+    target_class = "bookings.authentication.ClaimsTokenObtainPairSerializer"
+
+
+class ClaimsTokenRefreshSerializerExtension(TokenRefreshSerializerExtension):
+    target_class = "bookings.authentication.ClaimsTokenRefreshSerializer"
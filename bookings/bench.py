@@ -0,0 +1,45 @@
+"""
+Shared helpers for the bench_* management commands: latency summaries and
+JSON result files that can be diffed run to run.
+"""
+import json
+import math
+import platform
+
+from django.db import connection
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list (pct in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, elapsed):
+    """Throughput and latency percentiles (milliseconds) for one run."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "db_vendor": connection.vendor,
+        "db_name": str(connection.settings_dict.get("NAME")),
+    }
+
+
+def write_results(path, results):
+    with open(path, "w") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+        fh.write("\n")
@@ -0,0 +1,95 @@
+"""
+Booking dumps for finance / operations, as CSV or JSON Lines.
+
+Rows come from a values() queryset read with .iterator(chunk_size), so no model
+instances are built and only one chunk is in memory at a time (a server-side
+cursor on PostgreSQL). The same generators back GET /api/bookings/export/
+(StreamingHttpResponse) and `manage.py export_bookings`.
+
+With include_archived, rows moved to BookingArchive are exported too: the two
+tables have the same columns, so the export is a UNION ALL of both, still in
+(created_at, id) order.
+"""
+import csv
+import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Booking, BookingArchive
+
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_CHUNK_SIZE = 2000
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "jsonl": "application/x-ndjson"}
+
+# output column -> values() path
+EXPORT_COLUMNS = {
+    "id": "id",
+    "created_at": "created_at",
+    "status": "status",
+    "seat_number": "seat_number",
+    "user_id": "user_id",
+    "username": "user__username",
+    "show_id": "show_id",
+    "show_time": "show__date_time",
+    "screen": "show__screen_name",
+    "movie_id": "show__movie_id",
+    "movie": "show__movie__title",
+}
+
+
+def export_queryset(show=None, movie=None, created_from=None, created_to=None, include_archived=False):
+    """Bookings matching the filters as plain dicts, oldest first; created_to is exclusive."""
+    qs = _filtered(Booking.objects.all(), show, movie, created_from, created_to)
+    if include_archived:
+        archived = _filtered(BookingArchive.objects.all(), show, movie, created_from, created_to)
+        qs = qs.values(*EXPORT_COLUMNS.values()).union(archived.values(*EXPORT_COLUMNS.values()), all=True)
+        return qs.order_by("created_at", "id")
+    return qs.order_by("created_at", "id").values(*EXPORT_COLUMNS.values())
+
+
+def _filtered(qs, show, movie, created_from, created_to):
+    if show is not None:
+        qs = qs.filter(show_id=show)
+    if movie is not None:
+        qs = qs.filter(show__movie_id=movie)
+    if created_from is not None:
+        qs = qs.filter(created_at__gte=created_from)
+    if created_to is not None:
+        qs = qs.filter(created_at__lt=created_to)
+    return qs
+
+
+class _Echo:
+    """File-like object whose write() hands the line back, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row.values())
+
+
+class _ExportJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder, but datetimes keep their microseconds, as in the CSV and the database."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def iter_jsonl(rows):
+    encoder = _ExportJSONEncoder(separators=(",", ":"))
+    columns = list(EXPORT_COLUMNS)
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row.values()))) + "\n"
+
+
+def iter_export(fmt, chunk_size=EXPORT_CHUNK_SIZE, **filters):
+    """Lines of the export in `fmt`, streamed from the database chunk_size rows at a time."""
+    rows = export_queryset(**filters).iterator(chunk_size=chunk_size)
+    return iter_jsonl(rows) if fmt == "jsonl" else iter_csv(rows)
@@ -0,0 +1,133 @@
+"""
+Serializer-free output for the hot read-only list endpoints.
+
+compile_plan() walks a FlexFieldsMixin serializer once (for a given ?expand= /
+?fields= combination) and turns it into a plan: the values() paths to fetch and,
+per output field, the row key plus a converter. Converters are the DRF fields'
+own to_representation wherever that isn't a no-op on a values() column (dates,
+UUIDs, choice labels), so the dicts — and the rendered JSON — are identical to
+the ModelSerializer output. Plans are cached per combination.
+
+FastListMixin plugs this into a ListAPIView: page over queryset.values(), build
+dicts from the plan, render with FastJSONRenderer.
+"""
+from functools import lru_cache
+
+from rest_framework import serializers
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from .renderers import FastJSONRenderer
+from .serializers import FlexFieldsMixin, request_paths
+
+# values() already yields the representation for these
+_RAW_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+
+
+class Plan:
+    """Compiled field map: `entries` is [(name, row key, converter or None, nested Plan or None)]."""
+    __slots__ = ("entries", "paths", "pk_key")
+
+    def __init__(self, entries, paths, pk_key):
+        self.entries = entries
+        self.paths = paths
+        self.pk_key = pk_key
+
+    def dump(self, row):
+        out = {}
+        for name, key, convert, nested in self.entries:
+            if nested is not None:
+                # a null foreign key nests as None, like the serializer
+                out[name] = None if nested.pk_key and row[nested.pk_key] is None else nested.dump(row)
+                continue
+            value = row[key]
+            out[name] = value if convert is None or value is None else convert(value)
+        return out
+
+    def dump_many(self, rows):
+        dump = self.dump
+        return [dump(row) for row in rows]
+
+
+def _freeze(tree):
+    return tuple(sorted((name, _freeze(sub)) for name, sub in tree.items()))
+
+
+def _thaw(frozen):
+    return {name: _thaw(sub) for name, sub in frozen}
+
+
+def compile_plan(serializer_class, expand=None, fields=None):
+    """Plan for serializer_class with the given expand / fields trees (see serializers.parse_paths)."""
+    return _compile_cached(serializer_class, _freeze(expand or {}), _freeze(fields or {}))
+
+
+@lru_cache(maxsize=256)  # keys come from query strings, so keep the cache bounded
+def _compile_cached(serializer_class, expand, fields):
+    serializer = serializer_class(expand=_thaw(expand), fields=_thaw(fields))
+    return _compile(serializer, prefix="")
+
+
+def _compile(serializer, prefix):
+    model = serializer.Meta.model
+    entries, paths = [], []
+    pk_key = None
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        source = field.source
+        if isinstance(field, FlexFieldsMixin):
+            nested = _compile(field, prefix=f"{prefix}{source}__")
+            nested.pk_key = f"{prefix}{source}"  # the foreign key column, to spot nulls
+            entries.append((name, None, None, nested))
+            paths += [nested.pk_key, *nested.paths]
+            continue
+        column, convert = _column(model, field, source)
+        key = f"{prefix}{column}"
+        entries.append((name, key, convert, None))
+        paths.append(key)
+    return Plan(entries, list(dict.fromkeys(paths)), pk_key)
+
+
+def _column(model, field, source):
+    """(values() column, converter) for a leaf serializer field."""
+    if source.startswith("get_") and source.endswith("_display"):
+        column = source[len("get_"):-len("_display")]
+        choices = dict(model._meta.get_field(column).flatchoices)
+        return column, lambda value: str(choices.get(value, value))
+    if "." in source or source == "*":
+        raise ValueError(f"{type(field).__name__} {field.field_name!r}: source {source!r} has no values() column")
+    if isinstance(field, _RAW_FIELDS):
+        return source, None
+    return source, field.to_representation
+
+
+class FastListMixin:
+    """
+    ListAPIView mixin: pages come from queryset.values() and are turned into dicts
+    by a compiled plan of the view's serializer — no model or serializer instances
+    per row. Output is identical to the serializer path (see FastPathTests).
+    """
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        plan = compile_plan(
+            self.get_serializer_class(), request_paths(request, "expand"), request_paths(request, "fields")
+        )
+        # keyset pagination reads its position from the row, so fetch the ordering keys too
+        ordering = [key.lstrip("-") for key in getattr(self.paginator, "ordering", None) or ()]
+        rows = self.get_rows(list(dict.fromkeys(plan.paths + ordering)))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.dump_many(page))
+        return Response(plan.dump_many(rows))
+
+    def get_rows(self, paths):
+        """The values() queryset to page over; override to add rows from elsewhere."""
+        return self.filter_queryset(self.get_queryset()).values(*paths)
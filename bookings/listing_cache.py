@@ -0,0 +1,164 @@
+"""
+Read-through cache for the public catalog listings (movies/, movies/<id>/shows/).
+
+Each listing lives in a namespace ("movies", "shows:<movie_id>") with a version
+stamp; cached pages are keyed by namespace, version, host and query string.
+Invalidation just moves the namespace's version forward (see signals.py), so
+no key scanning is needed and it works on any cache backend.
+
+Versions are millisecond timestamps rather than counters: if the cache loses a
+version it restarts at "now", never at a value an old page was cached under.
+That also makes them usable as HTTP validators: the ETag is the version (plus
+the response format) and Last-Modified is the version's time, so a conditional
+GET for a cached page is answered with 304 from two cache reads — no query, no
+serialization. A version with no page stored from a 200 never yields a 304.
+A bump always lands in a later second than the version it replaces, so
+Last-Modified changes along with the ETag.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+LISTING_CACHE_TIMEOUT = 300  # seconds
+# availability moves with every booking, which doesn't bump versions — keep it short
+AVAILABILITY_CACHE_TIMEOUT = 15  # seconds
+VERSION_TIMEOUT = None  # versions never expire on their own
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def movies_namespace():
+    return "movies"
+
+
+def shows_namespace(movie_id):
+    return f"shows:{movie_id}"
+
+
+def availability_namespace():
+    return "availability"
+
+
+def _version_key(namespace):
+    return f"bookings:listing-version:{namespace}"
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _now_ms(), VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    key = _version_key(namespace)
+    current = cache.get(key) or 0
+    # Last-Modified only has whole seconds, so move past the current version's second:
+    # a client holding that second's Last-Modified must not get a 304 after a change
+    next_second = (current // 1000 + 1) * 1000
+    cache.set(key, max(_now_ms(), next_second), VERSION_TIMEOUT)
+
+
+def listing_cache_key(namespace, version, request):
+    params = sorted(request.query_params.lists())
+    digest = hashlib.md5(repr((request.get_host(), params)).encode(), usedforsecurity=False).hexdigest()
+    return f"bookings:listing:{namespace}:{version}:{digest}"
+
+
+def _record(namespace, outcome):
+    kind = namespace.split(":", 1)[0]
+    with _stats_lock:
+        _stats[(kind, outcome)] += 1
+
+
+def listing_cache_stats():
+    """Hit/miss counters per listing kind for this process, e.g. {"movies": {"hit": 3, "miss": 1}}."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    stats = {}
+    for (kind, outcome), n in snapshot.items():
+        stats.setdefault(kind, {"hit": 0, "miss": 0, "not_modified": 0})[outcome] = n
+    return stats
+
+
+def reset_listing_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class CachedListMixin:
+    """
+    ListAPIView mixin serving the paginated response body from cache.
+    Views implement get_cache_namespace(); responses carry X-Cache: HIT/MISS.
+    With conditional_get, responses also carry ETag / Last-Modified derived from
+    the namespace version and matching If-None-Match / If-Modified-Since get a 304,
+    but only once the page is known to be a 200.
+    Only turn it on for listings whose content changes only with their version.
+    """
+    cache_timeout = LISTING_CACHE_TIMEOUT
+    conditional_get = True
+
+    def get_cache_namespace(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        namespace = self.get_cache_namespace()
+        version = get_version(namespace)
+        key = listing_cache_key(namespace, version, request)
+        data = cache.get(key)
+        if self.conditional_get:
+            etag = f'"{version}-{request.accepted_renderer.format}"'
+            last_modified = version // 1000  # whole seconds; If-None-Match wins when both are sent
+            # only a page stored from a 200 can be "not modified": a version alone says
+            # nothing about whether the listing exists (e.g. the shows of a deleted movie)
+            if data is not None:
+                not_modified = self._not_modified(request, namespace, etag, last_modified)
+                if not_modified is not None:
+                    return not_modified
+
+        if data is not None:
+            _record(namespace, "hit")
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+        else:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, self.cache_timeout)
+                if self.conditional_get:
+                    # the page had expired, but the client's copy is still current
+                    not_modified = self._not_modified(request, namespace, etag, last_modified)
+                    if not_modified is not None:
+                        return not_modified
+            _record(namespace, "miss")
+            response["X-Cache"] = "MISS"
+
+        if self.conditional_get and response.status_code == 200:
+            self._add_validators(response, etag, last_modified)
+        return response
+
+    def _not_modified(self, request, namespace, etag, last_modified):
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            return None
+        _record(namespace, "not_modified")
+        return self._add_validators(response, etag, last_modified)
+
+    @staticmethod
+    def _add_validators(response, etag, last_modified):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)  # clients may keep it, but must revalidate
+        return response
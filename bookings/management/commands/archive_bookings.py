@@ -0,0 +1,66 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bookings.models import BookingArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move cancelled bookings and bookings for long-past shows from the Booking table to BookingArchive, "
+        "in batches of --batch-size rows, each in its own short transaction. Safe to run from cron; "
+        "rows a concurrent request has locked are left for the next run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, default=None, metavar="DAYS",
+            help="Archive bookings for shows that started more than DAYS ago (default: BOOKING_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--cancelled-older-than", type=int, default=None, metavar="DAYS",
+            help="Archive cancelled bookings made more than DAYS ago (default: BOOKING_ARCHIVE_CANCELLED_AFTER_DAYS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction.")
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches.")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived.")
+
+    def handle(self, *args, **options):
+        days = self._days(options["older_than"], "BOOKING_ARCHIVE_AFTER_DAYS", 30)
+        cancelled_days = self._days(options["cancelled_older_than"], "BOOKING_ARCHIVE_CANCELLED_AFTER_DAYS", 1)
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+        now = timezone.now()
+        cutoffs = {"cancelled_before": now - timedelta(days=cancelled_days), "shows_before": now - timedelta(days=days)}
+
+        if options["dry_run"]:
+            count = BookingArchive.archivable(**cutoffs).count()
+            self.stdout.write(f"would archive {count} booking(s)")
+            return
+
+        moved = batches = 0
+        after_id = 0
+        started = time.perf_counter()
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            n, after_id = BookingArchive.archive_batch(batch_size=options["batch_size"], after_id=after_id, **cutoffs)
+            if after_id is None:
+                break
+            moved += n
+            batches += 1
+            if options["pause"]:
+                time.sleep(options["pause"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"archived {moved} booking(s) in {batches} batch(es), {elapsed:.2f}s"
+        ))
+
+    @staticmethod
+    def _days(value, setting, default):
+        days = getattr(settings, setting, default) if value is None else value
+        if days < 0:
+            raise CommandError("day counts must be >= 0")
+        return days
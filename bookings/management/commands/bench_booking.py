@@ -0,0 +1,182 @@
+import multiprocessing
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from bookings import metrics
+from bookings.bench import environment, summarize, write_results
+from bookings.models import LOCKING_MODES, Booking, Movie, Show, Status
+
+User = get_user_model()
+
+
+def _book_worker(job):
+    """
+    One worker's share of the run. Module level so process pools can pickle it;
+    every worker (thread or process) uses its own database connection.
+    """
+    user_id, show_ids, seats, attempts, locking, seed = job
+    rng = random.Random(seed)
+    in_child = _in_child_process()
+    if in_child:
+        metrics.reset()  # forked copy of the parent's counters
+    user = User.objects.get(pk=user_id)
+    shows = list(Show.objects.filter(pk__in=show_ids))
+    latencies, outcomes = [], Counter()
+    try:
+        for _ in range(attempts):
+            show = rng.choice(shows)
+            seat = str(rng.randint(1, seats))
+            started = time.perf_counter()
+            try:
+                Booking.create_booking(user, show, seat, locking=locking)
+                outcomes["booked"] += 1
+            except ValueError as e:
+                outcomes[f"rejected: {e}"] += 1
+            except DatabaseError as e:
+                outcomes[f"{type(e).__name__}: {e}"] += 1
+            latencies.append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+    # threads share the parent's counters; processes report their own
+    return latencies, dict(outcomes), metrics.snapshot() if in_child else {}
+
+
+def _in_child_process():
+    return multiprocessing.parent_process() is not None
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test Booking.create_booking: N threads or processes, each with its own DB connection, "
+        "booking random seats on a set of fresh shows. Reports throughput, latency percentiles, "
+        "IntegrityError retries and rejection reasons."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--mode", choices=("threads", "processes"), default="threads")
+        parser.add_argument("--shows", type=int, default=1, help="Shows to spread bookings over.")
+        parser.add_argument("--seats", type=int, default=200, help="Seats per show.")
+        parser.add_argument(
+            "--attempts", type=int, default=None,
+            help="Total booking attempts (default: shows * seats, so some seats collide).",
+        )
+        parser.add_argument("--locking", choices=LOCKING_MODES, default=None, help="Override BOOKING_LOCKING.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark movie, shows and bookings.")
+        parser.add_argument("--json", dest="json_path", help="Write results to this file.")
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers must be >= 1")
+        if options["mode"] == "processes" and connections["default"].vendor == "sqlite" \
+                and connections["default"].is_in_memory_db():
+            raise CommandError("process mode needs a file-backed or server database")
+
+        movie, shows, users = self._setup(options["shows"], options["seats"], workers)
+        try:
+            results = self._run(shows, users, options)
+        finally:
+            if not options["keep"]:
+                movie.delete()
+                User.objects.filter(pk__in=[u.pk for u in users]).delete()
+
+        self._report(results)
+        if options["json_path"]:
+            write_results(options["json_path"], results)
+
+    def _setup(self, n_shows, seats, workers):
+        stamp = timezone.now().strftime("%Y%m%d%H%M%S%f")
+        movie = Movie.objects.create(title=f"bench-{stamp}", duration_minutes=120)
+        shows = Show.objects.bulk_create(
+            Show(movie=movie, screen_name=f"bench {i}", date_time=timezone.now(), total_seats=seats)
+            for i in range(n_shows)
+        )
+        users = [User.objects.create_user(username=f"bench-{stamp}-{i}") for i in range(workers)]
+        return movie, shows, users
+
+    def _run(self, shows, users, options):
+        workers = len(users)
+        total = options["attempts"] or len(shows) * options["seats"]
+        show_ids = [s.pk for s in shows]
+        jobs = [
+            (user.pk, show_ids, options["seats"], total // workers + (i < total % workers),
+             options["locking"], options["seed"] + i)
+            for i, user in enumerate(users)
+        ]
+
+        metrics.reset()
+        started = time.perf_counter()
+        if options["mode"] == "processes":
+            connections.close_all()  # never share a connection across fork
+            for conn in connections.all(initialized_only=True):
+                if hasattr(conn, "close_pool"):
+                    conn.close_pool()  # ...or a pool's sockets and threads (postgres profile)
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                outcomes = pool.map(_book_worker, jobs)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                outcomes = list(pool.map(_book_worker, jobs))
+        elapsed = time.perf_counter() - started
+
+        latencies, reasons, retry_metrics = [], Counter(), Counter(metrics.snapshot())
+        for lats, outcome, child_metrics in outcomes:
+            latencies += lats
+            reasons.update(outcome)
+            retry_metrics.update(child_metrics)
+
+        return {
+            "config": {
+                "mode": options["mode"],
+                "workers": workers,
+                "shows": len(shows),
+                "seats_per_show": options["seats"],
+                "attempts": total,
+                "locking": Booking._locking_mode(options["locking"]),
+            },
+            "environment": environment(),
+            "summary": summarize(latencies, elapsed),
+            "booked_per_s": round(reasons["booked"] / elapsed, 2) if elapsed else 0.0,
+            "outcomes": dict(reasons.most_common()),
+            "retries": {
+                "integrity_error_retries": int(retry_metrics.get("booking.retries", 0)),
+                "lock_conflicts": int(retry_metrics.get("booking.lock_conflicts", 0)),
+                "retries_exhausted": int(retry_metrics.get("booking.retry_exhausted", 0)),
+                "retry_wait_s": round(retry_metrics.get("booking.retry_wait_seconds", 0.0), 4),
+            },
+            "consistent": self._consistent(show_ids),
+        }
+
+    def _consistent(self, show_ids):
+        """booked_count must equal the number of BOOKED rows on every show."""
+        drift = (
+            Show.objects.filter(pk__in=show_ids)
+            .annotate(actual=Count("bookings", filter=Q(bookings__status=Status.BOOKED)))
+            .values_list("booked_count", "actual")
+        )
+        return all(stored == actual for stored, actual in drift)
+
+    def _report(self, results):
+        cfg, s = results["config"], results["summary"]
+        self.stdout.write(
+            f"{cfg['mode']} x{cfg['workers']} {cfg['locking']} on {results['environment']['db_vendor']}: "
+            f"{s['requests']} attempts in {s['elapsed_s']}s"
+        )
+        self.stdout.write(
+            f"  {s['throughput_per_s']} attempts/s, {results['booked_per_s']} bookings/s  "
+            f"p50 {s['p50_ms']} ms  p95 {s['p95_ms']} ms  p99 {s['p99_ms']} ms"
+        )
+        self.stdout.write(f"  retries: {results['retries']}")
+        for reason, n in results["outcomes"].items():
+            self.stdout.write(f"  {n:>7}  {reason}")
+        style = self.style.SUCCESS if results["consistent"] else self.style.ERROR
+        self.stdout.write(style(f"  booked_count consistent: {results['consistent']}"))
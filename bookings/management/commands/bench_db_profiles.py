@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.bench import write_results
+
+SQLITE_PROFILES = ("sqlite", "sqlite-wal")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run bench_booking once per DB_PROFILE, each against a fresh SQLite file in a temp dir, "
+        "and print the results side by side. Settings are read at startup, so every profile "
+        "runs in its own manage.py subprocess."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default=",".join(SQLITE_PROFILES))
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--mode", choices=("threads", "processes"), default="processes")
+        parser.add_argument("--shows", type=int, default=1)
+        parser.add_argument("--seats", type=int, default=500)
+        parser.add_argument("--locking", choices=("pessimistic", "optimistic"), default="pessimistic")
+        parser.add_argument("--json", dest="json_path", help="Write all profiles' results to this file.")
+
+    def handle(self, *args, **options):
+        profiles = [p for p in options["profiles"].split(",") if p]
+        unknown = set(profiles) - set(SQLITE_PROFILES)
+        if unknown:
+            raise CommandError(f"only SQLite profiles can run against a temp file: {', '.join(sorted(unknown))}")
+
+        manage = str(Path(settings.BASE_DIR) / "manage.py")
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile in profiles:
+                env = {**os.environ, "DB_PROFILE": profile, "SQLITE_PATH": os.path.join(tmp, f"{profile}.sqlite3")}
+                out = os.path.join(tmp, f"{profile}.json")
+                self._run([sys.executable, manage, "migrate", "-v0"], env)
+                self._run([
+                    sys.executable, manage, "bench_booking",
+                    "--workers", str(options["workers"]), "--mode", options["mode"],
+                    "--shows", str(options["shows"]), "--seats", str(options["seats"]),
+                    "--locking", options["locking"], "--json", out,
+                ], env)
+                with open(out) as fh:
+                    results[profile] = json.load(fh)
+
+        self.stdout.write(f"{'profile':<12} {'bookings/s':>11} {'attempts/s':>11} {'p50 ms':>9} {'p99 ms':>9}  errors")
+        for profile, r in results.items():
+            s = r["summary"]
+            errors = sum(n for reason, n in r["outcomes"].items() if not reason.startswith(("booked", "rejected")))
+            self.stdout.write(
+                f"{profile:<12} {r['booked_per_s']:>11} {s['throughput_per_s']:>11} "
+                f"{s['p50_ms']:>9} {s['p99_ms']:>9}  {errors}"
+            )
+        if options["json_path"]:
+            write_results(options["json_path"], results)
+
+    def _run(self, cmd, env):
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if proc.returncode:
+            raise CommandError(f"{' '.join(cmd[1:3])} failed:\n{proc.stderr}")
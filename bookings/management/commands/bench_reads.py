@@ -0,0 +1,97 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client, override_settings
+
+from bookings.bench import environment, summarize, write_results
+
+# (sync DRF path, async path) pairs; {show}/{movie} are filled from --show/--movie
+ENDPOINTS = {
+    "movies": ("/api/movies/?page=1", "/api/async/movies/"),
+    "movie-shows": ("/api/movies/{movie}/shows/?page=1", "/api/async/movies/{movie}/shows/"),
+    "seat-map": ("/api/shows/{show}/seats/", "/api/async/shows/{show}/seats/"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare read concurrency of the sync DRF views through the WSGI handler (thread pool) "
+        "with the native async views through the ASGI handler (one event loop). "
+        "Runs in-process against the configured database; seed it first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="movies")
+        parser.add_argument("--movie", type=int, default=1)
+        parser.add_argument("--show", type=int, default=1)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50, help="In-flight requests on the event loop.")
+        parser.add_argument("--workers", type=int, default=8, help="WSGI worker threads.")
+        parser.add_argument("--json", dest="json_path", help="Write results to this file.")
+
+    def handle(self, *args, **options):
+        sync_path, async_path = (
+            p.format(movie=options["movie"], show=options["show"]) for p in ENDPOINTS[options["endpoint"]]
+        )
+        # the in-process test clients always send Host: testserver
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            results = {
+                "endpoint": options["endpoint"],
+                "environment": environment(),
+                "wsgi_sync": self._run_wsgi(sync_path, options["requests"], options["workers"]),
+                "asgi_async": asyncio.run(self._run_asgi(async_path, options["requests"], options["concurrency"])),
+            }
+        for mode in ("wsgi_sync", "asgi_async"):
+            r = results[mode]
+            self.stdout.write(
+                f"{mode:>10}: {r['throughput_per_s']:>8} req/s  p50 {r['p50_ms']} ms  "
+                f"p95 {r['p95_ms']} ms  p99 {r['p99_ms']} ms  errors {r['errors']}"
+            )
+        if options["json_path"]:
+            write_results(options["json_path"], results)
+
+    def _run_wsgi(self, path, total, workers):
+        def worker(n):
+            client = Client()
+            latencies, errors = [], 0
+            for _ in range(n):
+                t0 = time.perf_counter()
+                status = client.get(path).status_code
+                latencies.append(time.perf_counter() - t0)
+                errors += status >= 400
+            close_old_connections()
+            return latencies, errors
+
+        shares = [total // workers + (i < total % workers) for i in range(workers)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(worker, shares))
+        elapsed = time.perf_counter() - started
+        latencies = [lat for lats, _ in outcomes for lat in lats]
+        if all(lats and e == len(lats) for lats, e in outcomes):
+            raise CommandError(f"every request to {path} failed — is the database seeded?")
+        return {**summarize(latencies, elapsed), "errors": sum(e for _, e in outcomes), "workers": workers}
+
+    async def _run_asgi(self, path, total, concurrency):
+        client = AsyncClient()
+        gate = asyncio.Semaphore(concurrency)
+        latencies, errors = [], 0
+
+        async def one():
+            nonlocal errors
+            async with gate:
+                t0 = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - t0)
+                errors += response.status_code >= 400
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        if errors == total:
+            raise CommandError(f"every request to {path} failed — is the database seeded?")
+        return {**summarize(latencies, elapsed), "errors": errors, "concurrency": concurrency}
@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.bench import environment, summarize, write_results
+from bookings.fastpath import compile_plan
+from bookings.models import Booking, Movie, Show
+from bookings.renderers import FastJSONRenderer, orjson
+from bookings.serializers import BookingSerializer, parse_paths, select_expanded
+from rest_framework.renderers import JSONRenderer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark: render N bookings through BookingSerializer + JSONRenderer, through the values() "
+        "fast path + JSONRenderer, and through the fast path + FastJSONRenderer (orjson). Each pass includes "
+        "the query. Rows are created in a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20, help="Timed passes per variant.")
+        parser.add_argument("--expand", default="show.movie", help='?expand= to render with ("" for flat ids).')
+        parser.add_argument("--json", dest="json_path", help="Write results to this file.")
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["repeat"] < 1:
+            raise CommandError("--rows and --repeat must be >= 1")
+        expand = parse_paths(options["expand"])
+        with transaction.atomic():
+            bookings = self._seed(options["rows"])
+            results = self._run(bookings, expand, options["repeat"])
+            transaction.set_rollback(True)
+        results.update(rows=options["rows"], expand=options["expand"], environment=environment())
+
+        for variant in ("serializer", "fast_path", "fast_path_orjson"):
+            r = results[variant]
+            self.stdout.write(
+                f"{variant:>16}: p50 {r['p50_ms']} ms  p95 {r['p95_ms']} ms  ({r['speedup']}x)"
+            )
+        self.stdout.write(f"identical output: {results['identical']}, orjson: {results['orjson']}")
+        if options["json_path"]:
+            write_results(options["json_path"], results)
+
+    def _seed(self, rows):
+        user = User.objects.create_user(username=f"bench-serializers-{time.time_ns()}")
+        movie = Movie.objects.create(title="Bench Serializers", duration_minutes=120)
+        show = Show.objects.create(movie=movie, screen_name="Bench", date_time=timezone.now(), total_seats=rows)
+        Booking.objects.bulk_create(
+            Booking(user=user, show=show, seat_number=str(seat)) for seat in range(1, rows + 1)
+        )
+        return Booking.objects.filter(show=show).order_by("id")
+
+    def _run(self, bookings, expand, repeat):
+        plan = compile_plan(BookingSerializer, expand)
+        variants = {
+            "serializer": lambda: JSONRenderer().render(
+                BookingSerializer(select_expanded(bookings, BookingSerializer, expand), many=True, expand=expand).data
+            ),
+            "fast_path": lambda: JSONRenderer().render(plan.dump_many(bookings.values(*plan.paths))),
+            "fast_path_orjson": lambda: FastJSONRenderer().render(plan.dump_many(bookings.values(*plan.paths))),
+        }
+        outputs = {name: render() for name, render in variants.items()}  # warm-up, and the equality check
+        results = {"identical": len(set(outputs.values())) == 1, "orjson": orjson is not None}
+        for name, render in variants.items():
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                render()
+                latencies.append(time.perf_counter() - t0)
+            results[name] = summarize(latencies, time.perf_counter() - started)
+        baseline = results["serializer"]["p50_ms"]
+        for name in variants:
+            p50 = results[name]["p50_ms"]
+            results[name]["speedup"] = round(baseline / p50, 2) if p50 else 0.0
+        return results
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.query_plans import explain_hot_queries
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN every hot query and fail if any of them falls back to a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full plan for each query.")
+
+    def handle(self, *args, **options):
+        failed = []
+        for name, plan, scans in explain_hot_queries():
+            if scans:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: full scan of {', '.join(scans)}"))
+            else:
+                self.stdout.write(f"{name}: ok")
+            if options["verbose_plans"] or scans:
+                self.stdout.write(f"    {plan}".replace("\n", "\n    "))
+
+        if failed:
+            raise CommandError(f"{len(failed)} hot query(ies) use a full scan: {', '.join(failed)}")
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from bookings.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+
+
+def _datetime(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"not an ISO 8601 datetime: {value!r}")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream bookings as CSV or JSON Lines to a file or stdout, optionally filtered by show, movie "
+        "and created_at range. Rows are read as values() in chunks, so memory stays flat on any table size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", default="-", help="File to write, or - for stdout.")
+        parser.add_argument("--show", type=int)
+        parser.add_argument("--movie", type=int)
+        parser.add_argument("--from", dest="created_from", type=_datetime, help="created_at >= (ISO 8601).")
+        parser.add_argument("--to", dest="created_to", type=_datetime, help="created_at < (ISO 8601).")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--include-archived", action="store_true", help="Also export bookings moved to BookingArchive."
+        )
+
+    def handle(self, *args, **options):
+        lines = iter_export(
+            options["format"],
+            chunk_size=options["chunk_size"],
+            show=options["show"],
+            movie=options["movie"],
+            created_from=options["created_from"],
+            created_to=options["created_to"],
+            include_archived=options["include_archived"],
+        )
+        if options["output"] == "-":
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        rows = -1 if options["format"] == "csv" else 0  # don't count the CSV header
+        with open(options["output"], "w", newline="", encoding="utf-8") as fh:
+            for line in lines:
+                fh.write(line)
+                rows += 1
+        self.stdout.write(self.style.SUCCESS(f"wrote {rows} booking(s) to {options['output']}"))
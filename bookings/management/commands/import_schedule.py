@@ -0,0 +1,144 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from bookings.listing_cache import availability_namespace, bump_version, shows_namespace
+from bookings.models import Movie, Show
+
+FORMATS = ("csv", "jsonl")
+
+
+def _read_csv(fh):
+    # header is line 1, so data rows start at line 2
+    for lineno, row in enumerate(csv.DictReader(fh), start=2):
+        yield lineno, row
+
+
+def _read_jsonl(fh):
+    for lineno, line in enumerate(fh, start=1):
+        if line.strip():
+            try:
+                yield lineno, json.loads(line)
+            except ValueError as e:
+                yield lineno, e
+
+
+def _positive_int(value, field):
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an integer")
+    if n < 1:
+        raise ValueError(f"{field} must be >= 1")
+    return n
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a show schedule from CSV (with a header row) or JSON Lines. Columns: movie, screen_name, "
+        "date_time (ISO 8601), total_seats, and optionally duration_minutes for movies that don't exist yet. "
+        "Rows are streamed and written with bulk_create, one transaction per --chunk-size rows, "
+        "so memory use doesn't grow with the file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Schedule file, or - for stdin.")
+        parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per INSERT.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per transaction.")
+        parser.add_argument(
+            "--create-movies", action="store_true",
+            help="Create movies that don't exist yet (needs duration_minutes); otherwise their rows are invalid.",
+        )
+        parser.add_argument(
+            "--skip-invalid", action="store_true",
+            help="Report and skip invalid rows instead of stopping at the first one.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--batch-size and --chunk-size must be >= 1")
+        fmt = options["format"] or ("jsonl" if options["path"].endswith((".jsonl", ".ndjson")) else "csv")
+
+        # one map for the whole import; titles aren't unique, the oldest movie wins
+        self.movie_ids = dict(Movie.objects.order_by("-id").values_list("title", "id"))
+        self.create_movies = options["create_movies"]
+        self.skip_invalid = options["skip_invalid"]
+        self.imported = self.skipped = 0
+
+        started = time.perf_counter()
+        if options["path"] == "-":
+            self._import(sys.stdin, fmt, options)
+        else:
+            with open(options["path"], newline="", encoding="utf-8") as fh:
+                self._import(fh, fmt, options)
+        elapsed = time.perf_counter() - started
+
+        rate = self.imported / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"imported {self.imported} show(s) in {elapsed:.2f}s ({rate:.0f} rows/s), skipped {self.skipped}"
+        ))
+
+    def _import(self, fh, fmt, options):
+        rows = (_read_jsonl if fmt == "jsonl" else _read_csv)(fh)
+        while True:
+            chunk = list(islice(rows, options["chunk_size"]))
+            if not chunk:
+                break
+            with transaction.atomic():
+                shows = [show for show in (self._build(lineno, row) for lineno, row in chunk) if show]
+                Show.objects.bulk_create(shows, batch_size=options["batch_size"])
+                # bulk_create sends no post_save, so move the listing versions here
+                namespaces = {shows_namespace(show.movie_id) for show in shows} | {availability_namespace()}
+                transaction.on_commit(lambda ns=namespaces: [bump_version(n) for n in ns])
+            self.imported += len(shows)
+
+    def _build(self, lineno, row):
+        try:
+            if isinstance(row, Exception):
+                raise ValueError(f"invalid JSON: {row}")
+            if not isinstance(row, dict):
+                raise ValueError("expected an object per line")
+            return Show(
+                movie_id=self._movie_id(row),
+                screen_name=self._required(row, "screen_name"),
+                date_time=self._date_time(row),
+                total_seats=_positive_int(row.get("total_seats"), "total_seats"),
+            )
+        except ValueError as e:
+            if not self.skip_invalid:
+                raise CommandError(
+                    f"line {lineno}: {e} ({self.imported} show(s) from earlier chunks were already imported)"
+                )
+            self.skipped += 1
+            self.stderr.write(f"line {lineno}: {e}, skipped")
+            return None
+
+    def _required(self, row, field):
+        value = str(row.get(field) or "").strip()
+        if not value:
+            raise ValueError(f"{field} is required")
+        return value
+
+    def _movie_id(self, row):
+        title = self._required(row, "movie")
+        movie_id = self.movie_ids.get(title)
+        if movie_id is None:
+            if not self.create_movies:
+                raise ValueError(f"unknown movie {title!r}")
+            duration = _positive_int(row.get("duration_minutes"), "duration_minutes")
+            movie_id = self.movie_ids[title] = Movie.objects.create(title=title, duration_minutes=duration).pk
+        return movie_id
+
+    def _date_time(self, row):
+        value = parse_datetime(self._required(row, "date_time"))
+        if value is None:
+            raise ValueError("date_time must be ISO 8601")
+        return timezone.make_aware(value) if timezone.is_naive(value) else value
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from bookings.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds in one bulk statement. Safe to run from cron every minute."
+
+    def handle(self, *args, **options):
+        deleted = SeatHold.sweep_expired()
+        self.stdout.write(self.style.SUCCESS(f"swept {deleted} expired hold(s)"))
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from bookings.models import Booking, BookingArchive, Show, Status
+
+
+def _booked_count_subquery(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(show=OuterRef("pk"), status=Status.BOOKED)
+            .order_by()
+            .values("show")
+            .annotate(n=Count("pk"))
+            .values("n")
+        ),
+        0,
+    )
+
+
+def _actual_booked_subquery():
+    # archived bookings of past shows still count towards their booked_count
+    return _booked_count_subquery(Booking) + _booked_count_subquery(BookingArchive)
+
+
+class Command(BaseCommand):
+    help = "Verify or rebuild Show.booked_count from the bookings and booking archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift; exit with an error if any show is out of sync.",
+        )
+        parser.add_argument("--show", type=int, help="Limit to a single show id.")
+
+    def handle(self, *args, **options):
+        shows = Show.objects.all()
+        if options["show"]:
+            shows = shows.filter(pk=options["show"])
+
+        with transaction.atomic():
+            if not options["check"]:
+                # hold the show rows so bookings can't move the counter mid-rebuild
+                shows = shows.select_for_update()
+            drifted = list(
+                shows.annotate(actual=_actual_booked_subquery())
+                .exclude(booked_count=F("actual"))
+                .values_list("pk", "booked_count", "actual")
+            )
+            for pk, stored, actual in drifted:
+                self.stdout.write(f"show {pk}: booked_count={stored} actual={actual}")
+
+            if options["check"]:
+                if drifted:
+                    raise CommandError(f"{len(drifted)} show(s) have a stale booked_count")
+                self.stdout.write(self.style.SUCCESS("booked_count is in sync"))
+                return
+
+            for pk, _stored, actual in drifted:
+                Show.objects.filter(pk=pk).update(booked_count=actual)
+
+        self.stdout.write(self.style.SUCCESS(f"rebuilt booked_count for {len(drifted)} show(s)"))
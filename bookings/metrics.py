@@ -0,0 +1,124 @@
+"""
+In-process metrics: named counters and running sums, plus rolling per-endpoint
+latency histograms. Safe to update from worker threads and event-loop tasks
+alike. Values are per process.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+_values = defaultdict(float)
+_lock = threading.Lock()
+
+# histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+WINDOW_SECONDS = 60
+
+
+def incr(name, value=1):
+    with _lock:
+        _values[name] += value
+
+
+def snapshot():
+    with _lock:
+        return dict(_values)
+
+
+def reset():
+    with _lock:
+        _values.clear()
+    histograms.reset()
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.total += other.total
+        self.sum += other.sum
+
+
+class RollingHistograms:
+    """
+    Fixed-bucket histograms keyed by (endpoint, metric). Two windows are kept —
+    the current one and the one before it — so reports cover the last one to two
+    windows and memory stays bounded no matter how long the process runs.
+    """
+
+    def __init__(self, window_seconds=WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._current = defaultdict(_Histogram)
+            self._previous = {}
+            self._window_started = time.monotonic()
+
+    def _rotate(self, now):
+        if now - self._window_started >= self.window_seconds:
+            # a gap of more than one window means the previous window is empty too
+            stale = now - self._window_started >= 2 * self.window_seconds
+            self._previous = {} if stale else self._current
+            self._current = defaultdict(_Histogram)
+            self._window_started = now
+
+    def observe(self, endpoint, metric, value_ms):
+        bucket = bisect.bisect_left(BUCKETS_MS, value_ms)
+        with self._lock:
+            self._rotate(time.monotonic())
+            h = self._current[(endpoint, metric)]
+            h.counts[bucket] += 1
+            h.total += 1
+            h.sum += value_ms
+
+    def report(self):
+        """{endpoint: {metric: {count, mean_ms, p50_ms, p95_ms, p99_ms, buckets}}}"""
+        with self._lock:
+            self._rotate(time.monotonic())
+            merged = defaultdict(_Histogram)
+            for window in (self._previous, self._current):
+                for key, h in window.items():
+                    merged[key].merge(h)
+
+        report = {}
+        for (endpoint, metric), h in sorted(merged.items()):
+            report.setdefault(endpoint, {})[metric] = {
+                "count": h.total,
+                "mean_ms": round(h.sum / h.total, 3) if h.total else 0.0,
+                "p50_ms": _bucket_percentile(h, 50),
+                "p95_ms": _bucket_percentile(h, 95),
+                "p99_ms": _bucket_percentile(h, 99),
+                "buckets": {_bucket_label(i): n for i, n in enumerate(h.counts) if n},
+            }
+        return report
+
+
+def _bucket_label(i):
+    return f"le_{BUCKETS_MS[i]}" if i < len(BUCKETS_MS) else "inf"
+
+
+def _bucket_percentile(h, pct):
+    """Upper bound of the bucket holding the pct-th observation (None if it's the open bucket)."""
+    if not h.total:
+        return 0.0
+    rank = pct / 100 * h.total
+    seen = 0
+    for i, n in enumerate(h.counts):
+        seen += n
+        if seen >= rank:
+            return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else None
+    return None
+
+
+histograms = RollingHistograms()
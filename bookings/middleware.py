@@ -0,0 +1,126 @@
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from . import metrics
+
+
+class _QueryTimer:
+    """connection.execute_wrapper hook: counts queries and sums their time, no DEBUG needed."""
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+# the timer of the request being served; asgiref copies it into the threads
+# that run sync views and the async ORM, so it follows the request under ASGI
+_current_timer = ContextVar("perf_query_timer", default=None)
+
+
+def _timed_execute(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def _install_timer(conn):
+    """Add the (pass-through unless a request is being timed) hook to this thread's connection, once."""
+    if _timed_execute not in conn.execute_wrappers:
+        conn.execute_wrappers.append(_timed_execute)
+
+
+class PerformanceMiddleware:
+    """
+    Per-request timing: wall time, DB query count and time, and response render
+    (serialization) time. Emitted as a Server-Timing header and folded into the
+    rolling per-endpoint histograms behind GET /api/_stats/.
+
+    With settings.PERF_INSTRUMENTATION off the middleware raises MiddlewareNotUsed,
+    so Django drops it from the chain and it costs nothing.
+
+    Under ASGI, views and the async ORM run their queries on a worker thread's
+    connection. process_view runs on that thread, so it hooks the connection
+    there, and the hook finds the request's timer through a contextvar.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = _QueryTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        _install_timer(connection)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self._finish(request, response, started, timer)
+
+    async def __acall__(self, request):
+        timer = _QueryTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self._finish(request, response, started, timer)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # sync, so under ASGI Django runs it on the thread the view's queries use
+        _install_timer(connection)
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that step separately
+        render_started = time.perf_counter()
+
+        def rendered(response):
+            request._perf_render_seconds = time.perf_counter() - render_started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, started, timer):
+        total_ms = (time.perf_counter() - started) * 1000
+        render_ms = getattr(request, "_perf_render_seconds", 0.0) * 1000
+        match = request.resolver_match
+        endpoint = match.view_name if match else "unresolved"
+
+        db_ms = timer.seconds * 1000
+        timings = [
+            f'db;dur={db_ms:.2f};desc="{timer.count} queries"',
+            f"app;dur={total_ms - db_ms - render_ms:.2f}",
+            f"render;dur={render_ms:.2f}",
+            f"total;dur={total_ms:.2f}",
+        ]
+        metrics.histograms.observe(endpoint, "total", total_ms)
+        metrics.histograms.observe(endpoint, "render", render_ms)
+        metrics.histograms.observe(endpoint, "db", db_ms)
+        metrics.incr(f"http.{endpoint}.requests")
+        metrics.incr(f"http.{endpoint}.queries", timer.count)
+        response["Server-Timing"] = ", ".join(timings)
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:23
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_booked_count(apps, schema_editor):
+    Show = apps.get_model("bookings", "Show")
+    Booking = apps.get_model("bookings", "Booking")
+    booked = (
+        Booking.objects.filter(show=OuterRef("pk"), status="booked")
+        .order_by()
+        .values("show")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Show.objects.update(booked_count=Coalesce(Subquery(booked), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0002_alter_booking_options_alter_movie_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="show",
+            name="booked_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_booked_count, migrations.RunPython.noop),
+    ]
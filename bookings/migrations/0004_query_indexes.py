@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0003_show_booked_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="booking_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="show",
+            index=models.Index(
+                fields=["movie", "date_time", "id"], name="show_movie_date_idx"
+            ),
+        ),
+        # the composite indexes above lead with these columns, so the FK indexes are redundant
+        migrations.AlterField(
+            model_name="booking",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="bookings",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="show",
+            name="movie",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="shows",
+                to="bookings.movie",
+            ),
+        ),
+    ]
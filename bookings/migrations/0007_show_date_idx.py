@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0006_booking_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="show",
+            index=models.Index(fields=["date_time", "id"], name="show_date_idx"),
+        ),
+    ]
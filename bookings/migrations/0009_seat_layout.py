@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:04
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0008_booking_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatLayout",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                (
+                    "rows",
+                    models.PositiveSmallIntegerField(
+                        validators=[
+                            django.core.validators.MinValueValidator(1),
+                            django.core.validators.MaxValueValidator(26),
+                        ]
+                    ),
+                ),
+                (
+                    "seats_per_row",
+                    models.PositiveSmallIntegerField(
+                        validators=[
+                            django.core.validators.MinValueValidator(1),
+                            django.core.validators.MaxValueValidator(999),
+                        ]
+                    ),
+                ),
+                ("blocked", models.TextField(blank=True, default="", editable=False)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="show",
+            name="total_seats",
+            field=models.PositiveIntegerField(
+                help_text="Set from the layout's capacity when there is one."
+            ),
+        ),
+        migrations.AddField(
+            model_name="show",
+            name="layout",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="shows",
+                to="bookings.seatlayout",
+            ),
+        ),
+    ]
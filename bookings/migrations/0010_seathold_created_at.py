@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0009_seat_layout"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="seathold",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
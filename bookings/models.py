@@ -1,11 +1,22 @@
+import asyncio
+import random
 import re
 import time
-from django.db import models, transaction, IntegrityError
-from django.db.models import Q
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, models, transaction, IntegrityError, OperationalError
+from django.db.models import F, Q
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from . import metrics
+from .seatmap import ROW_LETTERS, encode_seats, invalidate_seat_map, seat_index, seat_label
+
 User = get_user_model()
 
 
@@ -20,23 +31,113 @@ class Movie(models.Model):
     def __str__(self):
         return self.title
 
+class SeatLayout(models.Model):
+    """
+    Seating plan shared by the shows on a screen: `rows` rows lettered from A,
+    `seats_per_row` seats numbered from 1, minus the blocked ones (aisles, broken
+    or removed seats). Seat labels are row letter + number, e.g. "C12".
+    Blocked seats are stored as a bitset (see seatmap.encode_seats).
+    """
+    name = models.CharField(max_length=100, unique=True)
+    rows = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(len(ROW_LETTERS))])
+    seats_per_row = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(999)])
+    blocked = models.TextField(blank=True, default="", editable=False)
+
+    def __str__(self):
+        return f"{self.name} ({self.rows}x{self.seats_per_row}, {self.capacity} seats)"
+
+    def seat_index(self):
+        return seat_index(self.rows, self.seats_per_row, self.blocked)
+
+    @property
+    def capacity(self):
+        return self.seat_index().capacity
+
+    def blocked_labels(self):
+        return [seat_label(p, self.seats_per_row) for p in sorted(self.seat_index().blocked)]
+
+    def set_blocked(self, labels):
+        """Block exactly these seats; raises ValueError for labels outside the grid."""
+        grid = seat_index(self.rows, self.seats_per_row)
+        positions = []
+        for label in labels:
+            position = grid.position(label.strip().upper())
+            if position is None:
+                raise ValueError(f"seat {label!r} is not in a {self.rows}x{self.seats_per_row} layout")
+            positions.append(position)
+        self.blocked = encode_seats(positions, grid.size) if positions else ""
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # capacity is denormalized onto the shows, for availability queries
+        self.shows.exclude(total_seats=self.capacity).update(total_seats=self.capacity)
+
+
 class Show(models.Model):
-    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="shows")
+    # show_movie_date_idx leads with movie, so the FK needs no index of its own
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="shows", db_index=False)
     screen_name = models.CharField(max_length=100)
     date_time = models.DateTimeField()
-    total_seats = models.PositiveIntegerField()
+    total_seats = models.PositiveIntegerField(help_text="Set from the layout's capacity when there is one.")
+    layout = models.ForeignKey(SeatLayout, on_delete=models.PROTECT, null=True, blank=True, related_name="shows")
+    # denormalized count of BOOKED bookings; maintained by create_booking/cancel,
+    # rebuilt with `manage.py sync_booked_counts`
+    booked_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # movies/<id>/shows/: filter by movie, keyset on (date_time, id)
+            models.Index(fields=["movie", "date_time", "id"], name="show_movie_date_idx"),
+            # shows/available/: date_time range across all movies, keyset on (date_time, id)
+            models.Index(fields=["date_time", "id"], name="show_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.movie.title} — {self.screen_name} @ {self.date_time}"
 
+    def save(self, *args, **kwargs):
+        if self.layout_id is not None:
+            self.total_seats = self.layout.capacity
+        super().save(*args, **kwargs)
+
     def seats_booked_count(self):
-        return self.bookings.filter(status=Status.BOOKED).count()
+        return self.booked_count
+
+    @staticmethod
+    def _reserve_seats(show_pk, count=1):
+        """
+        Conditionally bump booked_count by `count` if it still fits in total_seats.
+        Single UPDATE — returns True if the seats were reserved, False if the show is full.
+        """
+        updated = Show.objects.filter(
+            pk=show_pk, booked_count__lte=F("total_seats") - count
+        ).update(booked_count=F("booked_count") + count)
+        return updated == 1
+
+    @staticmethod
+    def _release_seats(show_pk, count=1):
+        Show.objects.filter(pk=show_pk, booked_count__gte=count).update(
+            booked_count=F("booked_count") - count
+        )
 
 # Booking model with robust create and cancel logic
+LOCKING_PESSIMISTIC = "pessimistic"  # lock the Show row for the whole booking transaction
+LOCKING_OPTIMISTIC = "optimistic"  # rely on unique_booked_seat, touch the Show row only at the end
+LOCKING_MODES = (LOCKING_PESSIMISTIC, LOCKING_OPTIMISTIC)
+
 SEAT_PATTERN = re.compile(r"^([A-Z])?(\d{1,4})$")  # adjust to your seat naming scheme
 
+PG_LOCK_NOT_AVAILABLE = "55P03"  # SQLSTATE raised by FOR UPDATE NOWAIT on a locked row
+PG_DEADLOCK_DETECTED = "40P01"  # SQLSTATE of the transaction PostgreSQL aborts to break a deadlock
+
+
+class BookingBusy(Exception):
+    """The booking's row is locked by another transaction; the caller may retry shortly."""
+
+
 class Booking(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="bookings")
+    # covered by booking_user_created_idx
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="bookings", db_index=False)
     show = models.ForeignKey(Show, on_delete=models.CASCADE, related_name="bookings")
     seat_number = models.CharField(max_length=10)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.BOOKED)
@@ -44,12 +145,19 @@ class Booking(models.Model):
 
     class Meta:
         constraints = [
+            # also the partial index behind (show, status=booked) lookups: seat taken, seat map
             models.UniqueConstraint(
                 fields=["show", "seat_number"],
                 condition=Q(status=Status.BOOKED),
                 name="unique_booked_seat"
             )
         ]
+        indexes = [
+            # my-bookings/: filter by user, keyset on (-created_at, -id)
+            models.Index(fields=["user", "-created_at", "-id"], name="booking_user_created_idx"),
+            # bookings/export/: created_at range, streamed in (created_at, id) order
+            models.Index(fields=["created_at", "id"], name="booking_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} — {self.show} seat {self.seat_number} ({self.status})"
@@ -58,18 +166,38 @@ class Booking(models.Model):
         """
         Idempotent cancellation — safe to call multiple times.
         Returns True if status changed to CANCELLED, False if it was already cancelled.
+        Where the database supports SKIP LOCKED, a booking whose row is locked by
+        another transaction (a concurrent cancel that may still roll back, or the
+        archiver) raises BookingBusy right away instead of waiting for it.
         """
         with transaction.atomic():
-            b = Booking.objects.select_for_update().get(pk=self.pk)
+            if Booking._fail_fast_locks() and connection.features.has_select_for_update_skip_locked:
+                b = Booking.objects.select_for_update(skip_locked=True).filter(pk=self.pk).first()
+                if b is None:
+                    if not Booking.objects.filter(pk=self.pk).exists():
+                        raise Booking.DoesNotExist("Booking matching query does not exist.")
+                    raise BookingBusy("Booking is being updated by another request, retry shortly.")
+            else:
+                b = Booking.objects.select_for_update().get(pk=self.pk)
             if b.status == Status.CANCELLED:
                 return False
             b.status = Status.CANCELLED
             b.save(update_fields=["status"])
+            Show._release_seats(b.show_id)
+            Booking._seats_changed(b.show_id)
             return True
 
     @staticmethod
     def _validate_seat_number(show: "Show", seat_number: str):
-        m = SEAT_PATTERN.match(seat_number.strip().upper())
+        seat_number = seat_number.strip().upper()
+        if show.layout_id is not None:
+            # one lookup in the layout's cached seat index
+            if seat_number not in show.layout.seat_index().positions:
+                raise ValidationError(f"seat {seat_number} is not a bookable seat of this show")
+            return seat_number
+
+        # no layout: only the number counts, checked against total_seats
+        m = SEAT_PATTERN.match(seat_number)
         if not m:
             raise ValidationError("seat_number must match pattern (optional letter + number), e.g. A12 or 12")
 
@@ -80,15 +208,87 @@ class Booking(models.Model):
         if num_part > show.total_seats:
             raise ValidationError(f"seat number {num_part} exceeds capacity ({show.total_seats})")
 
-        return seat_number.strip().upper()
+        return seat_number
+
+    @staticmethod
+    def _seats_changed(show_pk):
+        # drop the cached seat map once the surrounding transaction commits
+        transaction.on_commit(lambda: invalidate_seat_map(show_pk))
+
+    @staticmethod
+    def _locking_mode(locking=None):
+        mode = locking or getattr(settings, "BOOKING_LOCKING", LOCKING_PESSIMISTIC)
+        if mode not in LOCKING_MODES:
+            raise ValueError(f"unknown booking locking mode {mode!r}")
+        return mode
+
+    @staticmethod
+    def _fail_fast_locks():
+        return getattr(settings, "BOOKING_LOCK_NOWAIT", False)
+
+    @staticmethod
+    def _lock_nowait():
+        """nowait= for select_for_update on the Show row: only where the backend supports it."""
+        return Booking._fail_fast_locks() and connection.features.has_select_for_update_nowait
+
+    @staticmethod
+    def _is_lock_conflict(exc):
+        """
+        PostgreSQL NOWAIT found the row locked or PostgreSQL aborted this transaction
+        to break a deadlock, or SQLite gave up waiting for its write lock.
+        """
+        if getattr(exc.__cause__, "sqlstate", None) in (PG_LOCK_NOT_AVAILABLE, PG_DEADLOCK_DETECTED):
+            return True
+        return "database is locked" in str(exc)
+
+    @staticmethod
+    def _retry_reason(exc):
+        """Client message for a retriable booking error, or None if exc should propagate."""
+        if isinstance(exc, IntegrityError):
+            # likely unique constraint hit due to concurrent commit
+            return "Seat could not be reserved due to concurrent requests. Please try again."
+        if Booking._is_lock_conflict(exc):
+            metrics.incr("booking.lock_conflicts")
+            return "Show is busy with other bookings. Please try again."
+        return None
 
     @staticmethod
-    def create_booking(user, show, seat_number, max_retries=3, retry_delay=0.05):
+    def _retry_delay(attempts, max_retries, retry_delay, deadline_at):
         """
-        Robust booking with retries on IntegrityError.
+        Seconds to wait before the next attempt, or None to give up.
+        Full-jitter exponential backoff (uniform in [0, retry_delay * 2**(attempts-1)]),
+        never past the request's deadline.
+        """
+        remaining = deadline_at - time.monotonic()
+        if attempts >= max_retries or remaining <= 0:
+            metrics.incr("booking.retry_exhausted")
+            return None
+        delay = min(random.uniform(0, retry_delay * 2 ** (attempts - 1)), remaining)
+        metrics.incr("booking.retries")
+        metrics.incr("booking.retry_wait_seconds", delay)
+        return delay
+
+    @staticmethod
+    def _deadline_at(deadline):
+        if deadline is None:
+            deadline = getattr(settings, "BOOKING_RETRY_DEADLINE_SECONDS", 0.5)
+        return time.monotonic() + deadline
+
+    @staticmethod
+    def create_booking(user, show, seat_number, max_retries=3, retry_delay=0.05, locking=None, deadline=None):
+        """
+        Robust booking with retries on IntegrityError and lock conflicts.
         - Validates seat format and range.
-        - Uses select_for_update on the show row, checks counts, then attempts to create booking.
-        - Catches IntegrityError and retries a few times (optimistic fallback).
+        - Pessimistic mode (default): uses select_for_update on the show row, reserves
+          capacity with a conditional UPDATE on Show.booked_count, then attempts to
+          create booking. Catches IntegrityError and retries with jittered backoff,
+          bounded by max_retries and a per-call deadline (seconds).
+        - With BOOKING_LOCK_NOWAIT on PostgreSQL the show row is locked NOWAIT: a
+          request that finds it locked backs off and retries the same way rather
+          than queueing behind the lock holder.
+        - Optimistic mode (settings.BOOKING_LOCKING = "optimistic"): see
+          _create_booking_optimistic. A lock conflict on its capacity UPDATE (e.g.
+          SQLite's "database is locked") is retried the same way.
         Raises ValueError for client-friendly errors.
         """
         # validate seat format / range before DB locking
@@ -97,28 +297,324 @@ class Booking(models.Model):
         except ValidationError as e:
             raise ValueError(str(e))
 
+        attempt = Booking._attempt(locking)
+        deadline_at = Booking._deadline_at(deadline)
         attempts = 0
         while True:
             attempts += 1
             try:
-                with transaction.atomic():
-                    locked_show = Show.objects.select_for_update().get(pk=show.pk)
+                return attempt(user, show, seat_number)
+            except (IntegrityError, OperationalError) as e:
+                reason = Booking._retry_reason(e)
+                if reason is None:
+                    raise
+                delay = Booking._retry_delay(attempts, max_retries, retry_delay, deadline_at)
+                if delay is None:
+                    raise ValueError(reason)
+                time.sleep(delay)
+
+    @staticmethod
+    async def acreate_booking(user, show, seat_number, max_retries=3, retry_delay=0.05, locking=None, deadline=None):
+        """
+        Async create_booking for ASGI views: each attempt runs in a worker thread,
+        and the backoff between attempts yields to the event loop instead of
+        blocking a thread.
+        """
+        try:
+            seat_number = Booking._validate_seat_number(show, seat_number)
+        except ValidationError as e:
+            raise ValueError(str(e))
+
+        attempt = sync_to_async(Booking._attempt(locking))
+        deadline_at = Booking._deadline_at(deadline)
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                return await attempt(user, show, seat_number)
+            except (IntegrityError, OperationalError) as e:
+                reason = Booking._retry_reason(e)
+                if reason is None:
+                    raise
+                delay = Booking._retry_delay(attempts, max_retries, retry_delay, deadline_at)
+                if delay is None:
+                    raise ValueError(reason)
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _attempt(locking):
+        """The single-attempt booking function for the locking mode."""
+        if Booking._locking_mode(locking) == LOCKING_OPTIMISTIC:
+            return Booking._create_booking_optimistic
+        return Booking._create_booking_locked
+
+    @staticmethod
+    def _create_booking_locked(user, show, seat_number):
+        """One pessimistic booking attempt; IntegrityError and lock conflicts propagate so the caller can retry."""
+        with transaction.atomic():
+            locked_show = Show.objects.select_for_update(nowait=Booking._lock_nowait()).get(pk=show.pk)
 
-                    # check if seat already booked (BOOKED)
-                    exists = Booking.objects.filter(show=locked_show, seat_number=seat_number, status=Status.BOOKED).exists()
-                    if exists:
-                        raise ValueError("Seat already booked")
+            # check if seat already booked (BOOKED)
+            exists = Booking.objects.filter(show=locked_show, seat_number=seat_number, status=Status.BOOKED).exists()
+            if exists:
+                raise ValueError("Seat already booked")
+            if SeatHold.held_by_others(locked_show, [seat_number], user):
+                raise ValueError("Seat is on hold")
 
-                    booked = Booking.objects.filter(show=locked_show, status=Status.BOOKED).count()
-                    if booked >= locked_show.total_seats:
-                        raise ValueError("Show is fully booked")
+            if not Show._reserve_seats(locked_show.pk):
+                raise ValueError("Show is fully booked")
 
-                    booking = Booking.objects.create(user=user, show=locked_show, seat_number=seat_number, status=Status.BOOKED)
-                    return booking
+            # attach the caller's show (which may carry select_related data), not the locked copy
+            booking = Booking.objects.create(user=user, show=show, seat_number=seat_number, status=Status.BOOKED)
+            Booking._seats_changed(show.pk)
+            return booking
 
+    @staticmethod
+    def _create_booking_optimistic(user, show, seat_number):
+        """
+        Booking without serializing on the Show row.
+        - Inserts first and lets the unique_booked_seat partial constraint reject
+          a seat that is already booked, so different seats never wait on each other.
+        - Reserves capacity last with the conditional UPDATE, so the Show row lock
+          is only held from that statement until commit.
+        Lock conflicts (OperationalError) propagate so create_booking can retry.
+        """
+        if SeatHold.held_by_others(show, [seat_number], user):
+            raise ValueError("Seat is on hold")
+        try:
+            with transaction.atomic():
+                booking = Booking.objects.create(user=user, show=show, seat_number=seat_number, status=Status.BOOKED)
+                if not Show._reserve_seats(show.pk):
+                    raise ValueError("Show is fully booked")
+                Booking._seats_changed(show.pk)
+                return booking
+        except IntegrityError:
+            raise ValueError("Seat already booked")
+
+    @staticmethod
+    def create_bookings(user, show, seat_numbers, locking=None):
+        """
+        All-or-nothing booking of several seats (group bookings).
+        - Validates every seat up front, rejects duplicates within the request.
+        - One transaction, one Show lock (pessimistic mode), one conditional UPDATE
+          reserving len(seats) and one bulk insert — either every seat is booked or none.
+        - A show locked by another booking (NOWAIT, see create_booking) is reported
+          as busy rather than retried: the client resubmits the whole group.
+        - Rows are inserted in seat order, so two overlapping groups take their
+          unique_booked_seat entries in the same order instead of deadlocking.
+        Raises ValueError for client-friendly errors.
+        """
+        try:
+            seats = [Booking._validate_seat_number(show, s) for s in seat_numbers]
+        except ValidationError as e:
+            raise ValueError(str(e))
+        if not seats:
+            raise ValueError("at least one seat_number is required")
+        if len(set(seats)) != len(seats):
+            raise ValueError("duplicate seat_number in request")
+
+        optimistic = Booking._locking_mode(locking) == LOCKING_OPTIMISTIC
+        rows = [Booking(user=user, show=show, seat_number=s, status=Status.BOOKED) for s in sorted(seats)]
+        try:
+            with transaction.atomic():
+                if not optimistic:
+                    Show.objects.select_for_update(nowait=Booking._lock_nowait()).get(pk=show.pk)
+                    taken = sorted(
+                        Booking.objects.filter(show=show, seat_number__in=seats, status=Status.BOOKED)
+                        .values_list("seat_number", flat=True)
+                    )
+                    if taken:
+                        raise ValueError(f"Seat already booked: {', '.join(taken)}")
+                    if SeatHold.held_by_others(show, seats, user):
+                        raise ValueError("Seat is on hold")
+                    if not Show._reserve_seats(show.pk, len(seats)):
+                        raise ValueError(f"Not enough seats left for {len(seats)} seat(s)")
+                    bookings = Booking.objects.bulk_create(rows)
+                else:
+                    if SeatHold.held_by_others(show, seats, user):
+                        raise ValueError("Seat is on hold")
+                    bookings = Booking.objects.bulk_create(rows)
+                    if not Show._reserve_seats(show.pk, len(seats)):
+                        raise ValueError(f"Not enough seats left for {len(seats)} seat(s)")
+                Booking._seats_changed(show.pk)
+                order = {seat: i for i, seat in enumerate(seats)}
+                return sorted(bookings, key=lambda b: order[b.seat_number])  # back in request order
+        except IntegrityError:
+            raise ValueError("Seat already booked")
+        except OperationalError as e:
+            if not Booking._is_lock_conflict(e):
+                raise
+            metrics.incr("booking.lock_conflicts")
+            raise ValueError("Show is busy with other bookings. Please try again.")
+
+    @staticmethod
+    def create_booking_from_hold(user, show, hold_token):
+        """
+        Turn a valid seat hold into a booking.
+        The hold already made the seat this user's, so there is no Show lock or
+        pre-check: consuming the hold (a single DELETE) is the claim, and the insert
+        plus conditional booked_count UPDATE commit together with it.
+        Raises ValueError for client-friendly errors.
+        """
+        hold = SeatHold.objects.filter(token=hold_token, user=user, show=show).first()
+        if hold is None:
+            raise ValueError("Hold is invalid or has expired")
+        try:
+            with transaction.atomic():
+                consumed, _ = SeatHold.objects.filter(pk=hold.pk, expires_at__gt=timezone.now()).delete()
+                if not consumed:
+                    raise ValueError("Hold is invalid or has expired")
+                booking = Booking.objects.create(user=user, show=show, seat_number=hold.seat_number, status=Status.BOOKED)
+                if not Show._reserve_seats(show.pk):
+                    raise ValueError("Show is fully booked")
+                Booking._seats_changed(show.pk)
+                return booking
+        except IntegrityError:
+            raise ValueError("Seat already booked")
+
+
+class SeatHold(models.Model):
+    """
+    Temporary claim on a seat while the user checks out.
+    At most one row per (show, seat) — the unique index makes "is this seat held"
+    a single lookup — and expired rows are swept in bulk via the expires_at index.
+    A user holds at most BOOKING_MAX_HOLDS_PER_SHOW seats per show, and renewals
+    never keep a hold past BOOKING_HOLD_MAX_SECONDS from when it was taken.
+    """
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="seat_holds")
+    show = models.ForeignKey(Show, on_delete=models.CASCADE, related_name="holds")
+    seat_number = models.CharField(max_length=10)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["show", "seat_number"], name="unique_seat_hold"),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="seathold_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} — {self.show} seat {self.seat_number} until {self.expires_at}"
+
+    @staticmethod
+    def ttl():
+        return timedelta(seconds=getattr(settings, "BOOKING_HOLD_TTL_SECONDS", 300))
+
+    @staticmethod
+    def max_duration():
+        return timedelta(seconds=getattr(settings, "BOOKING_HOLD_MAX_SECONDS", 900))
+
+    @staticmethod
+    def max_per_show():
+        return getattr(settings, "BOOKING_MAX_HOLDS_PER_SHOW", 10)
+
+    @staticmethod
+    def held_by_others(show, seat_numbers, user):
+        return SeatHold.objects.filter(
+            show=show, seat_number__in=seat_numbers, expires_at__gt=timezone.now()
+        ).exclude(user=user).exists()
+
+    @staticmethod
+    def create_hold(user, show, seat_number):
+        """
+        Hold a free seat for BOOKING_HOLD_TTL_SECONDS.
+        Holding a seat you already hold extends the hold and keeps its token, but
+        not past BOOKING_HOLD_MAX_SECONDS after it was first taken.
+        Raises ValueError for client-friendly errors, including when the user
+        already holds BOOKING_MAX_HOLDS_PER_SHOW seats for the show. That check
+        runs before the insert, so concurrent requests may overshoot it slightly.
+        """
+        try:
+            seat_number = Booking._validate_seat_number(show, seat_number)
+        except ValidationError as e:
+            raise ValueError(str(e))
+
+        now = timezone.now()
+        expires_at = now + SeatHold.ttl()
+        with transaction.atomic():
+            if Booking.objects.filter(show=show, seat_number=seat_number, status=Status.BOOKED).exists():
+                raise ValueError("Seat already booked")
+            # an expired hold on this seat is dead weight — drop it in place
+            SeatHold.objects.filter(show=show, seat_number=seat_number, expires_at__lte=now).delete()
+            hold = SeatHold.objects.select_for_update().filter(show=show, seat_number=seat_number, user=user).first()
+            if hold is not None:
+                hold.expires_at = max(hold.expires_at, min(expires_at, hold.created_at + SeatHold.max_duration()))
+                hold.save(update_fields=["expires_at"])
+                return hold
+            limit = SeatHold.max_per_show()
+            if SeatHold.objects.filter(user=user, show=show, expires_at__gt=now).count() >= limit:
+                raise ValueError(f"You can hold at most {limit} seats for this show")
+            try:
+                with transaction.atomic():
+                    return SeatHold.objects.create(
+                        user=user, show=show, seat_number=seat_number, created_at=now, expires_at=expires_at
+                    )
             except IntegrityError:
-                # likely unique constraint hit due to concurrent commit
-                if attempts >= max_retries:
-                    raise ValueError("Seat could not be reserved due to concurrent requests. Please try again.")
-                time.sleep(retry_delay * attempts)
-                continue
+                raise ValueError("Seat is on hold")
+
+    @staticmethod
+    def sweep_expired(now=None):
+        """Delete every expired hold in one statement; returns the number removed."""
+        deleted, _ = SeatHold.objects.filter(expires_at__lte=now or timezone.now()).delete()
+        return deleted
+
+
+class BookingArchive(models.Model):
+    """
+    Bookings moved out of the hot Booking table by `manage.py archive_bookings`:
+    cancelled ones and those for shows long past. Same columns and ids as
+    Booking, so history can be listed alongside live bookings.
+    """
+    id = models.BigIntegerField(primary_key=True)  # the Booking id
+    # covered by archive_user_created_idx
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_bookings", db_index=False)
+    show = models.ForeignKey(Show, on_delete=models.CASCADE, related_name="archived_bookings")
+    seat_number = models.CharField(max_length=10)
+    status = models.CharField(max_length=20, choices=Status.choices)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # my-bookings/?history=true: filter by user, ordered like Booking
+            models.Index(fields=["user", "-created_at", "-id"], name="archive_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} — {self.show} seat {self.seat_number} ({self.status}, archived)"
+
+    @staticmethod
+    def archivable(cancelled_before, shows_before):
+        """Bookings cancelled (created) before cancelled_before, or for shows that started before shows_before."""
+        return Booking.objects.filter(
+            Q(status=Status.CANCELLED, created_at__lt=cancelled_before)
+            # a subquery rather than a join, so locking the bookings never locks a Show row
+            | Q(show__in=Show.objects.filter(date_time__lt=shows_before).values("pk"))
+        )
+
+    @staticmethod
+    def archive_batch(cancelled_before, shows_before, batch_size=1000, after_id=0):
+        """
+        Move up to batch_size archivable bookings with id > after_id in one short transaction.
+        Rows locked by a concurrent cancel are skipped (where the database has SKIP
+        LOCKED) and picked up by the next run.
+        Returns (rows moved, highest id looked at — None when nothing is left).
+        """
+        columns = [f.attname for f in BookingArchive._meta.concrete_fields if f.name != "archived_at"]
+        with transaction.atomic():
+            batch = BookingArchive.archivable(cancelled_before, shows_before).filter(pk__gt=after_id)
+            if connection.features.has_select_for_update_skip_locked:
+                batch = batch.select_for_update(skip_locked=True)
+            rows = list(batch.order_by("pk").values(*columns)[:batch_size])
+            if not rows:
+                return 0, None
+            BookingArchive.objects.bulk_create([BookingArchive(**row) for row in rows])
+            Booking.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+            for show_id in {row["show_id"] for row in rows if row["status"] == Status.BOOKED}:
+                Booking._seats_changed(show_id)
+        metrics.incr("booking.archived", len(rows))
+        return len(rows), rows[-1]["id"]
+
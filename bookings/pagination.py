@@ -0,0 +1,166 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+
+
+class DefaultPagination(pagination.PageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+
+
+def _flip(key):
+    return key[1:] if key.startswith("-") else f"-{key}"
+
+
+def keyset_condition(ordering, position):
+    """Rows strictly after `position` in `ordering`: (a > x) OR (a = x AND b > y) OR ..."""
+    keys = [key.lstrip("-") for key in ordering]
+    q = Q()
+    for i, key in enumerate(ordering):
+        op = "lt" if key.startswith("-") else "gt"
+        q |= Q(**dict(zip(keys[:i], position[:i])), **{f"{keys[i]}__{op}": position[i]})
+    # redundant, but gives the database a range condition on the leading index column
+    first = ordering[0]
+    return Q(**{f"{keys[0]}__{'lte' if first.startswith('-') else 'gte'}": position[0]}) & q
+
+
+def _json_default(value):
+    # isoformat keeps microseconds, which DjangoJSONEncoder would cut to milliseconds
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+    Keyset pagination on every field of `ordering`, e.g. (created_at, id). The
+    cursor holds the boundary row's values for all of them and the next page is
+    WHERE (created_at, id) > (x, y) ORDER BY created_at, id LIMIT page_size + 1.
+    Ties on the leading field are broken by the later ones, so no OFFSET is ever
+    needed (DRF's CursorPagination positions on the first field only and skips
+    ties with OFFSET). Ordering fields must be non-null and end in a unique one.
+    """
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.position, reverse = self.decode_cursor(request) or (None, False)
+        ordering = [_flip(key) for key in self.ordering] if reverse else list(self.ordering)
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(keyset_condition(ordering, self.position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        if self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._position(self.page[-1]) if self.page else self.position
+        return self.encode_cursor((position, False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._position(self.page[0]) if self.page else self.position
+        return self.encode_cursor((position, True))
+
+    def _position(self, row):
+        # rows are model instances, or dicts on the values() fast path
+        keys = [key.lstrip("-") for key in self.ordering]
+        if isinstance(row, dict):
+            return [row[key] for key in keys]
+        return [getattr(row, key) for key in keys]
+
+    def encode_cursor(self, cursor):
+        position, reverse = cursor
+        payload = json.dumps([position, int(reverse)], default=_json_default, separators=(",", ":"))
+        token = urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """(position, reverse) from the request's cursor, or None for the first page."""
+        token = request.query_params.get(self.cursor_query_param)
+        if token is None:
+            return None
+        try:
+            position, reverse = json.loads(urlsafe_b64decode(token.encode()))
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+
+class KeysetOrPagePagination(pagination.BasePagination):
+    """
+    Keyset (cursor) pagination by default — every page is the same indexed range
+    scan on the full ordering, no COUNT(*) and no OFFSET (see KeysetPagination).
+    Passing ?page=N falls back to page numbers.
+    Subclasses set `ordering`, most significant key first, ending in a unique field.
+    Combined querysets (union) can't take the keyset filter, so they always get page numbers.
+    """
+    ordering = None
+    page_query_param = "page"
+
+    def __init__(self):
+        self.keyset = KeysetPagination()
+        self.keyset.ordering = self.ordering
+        self.page_number = DefaultPagination()
+        self.active = self.keyset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.page_query_param in request.query_params or queryset.query.combinator:
+            self.active = self.page_number
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            self.active = self.keyset
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.keyset.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        params = self.keyset.get_schema_operation_parameters(view)
+        seen = {p["name"] for p in params}
+        return params + [
+            p for p in self.page_number.get_schema_operation_parameters(view) if p["name"] not in seen
+        ]
+
+    @property
+    def display_page_controls(self):
+        return self.active.display_page_controls
+
+    def to_html(self):
+        return self.active.to_html()
+
+
+class BookingHistoryPagination(KeysetOrPagePagination):
+    ordering = ("-created_at", "-id")
+
+
+class ShowSchedulePagination(KeysetOrPagePagination):
+    ordering = ("date_time", "id")
@@ -0,0 +1,65 @@
+"""
+Hot query shapes and an EXPLAIN-based full-scan detector.
+
+HOT_QUERIES mirrors the queries issued by views.py / models.py with placeholder
+ids; `manage.py check_query_plans` explains each one and fails if the plan
+scans a whole table instead of using an index.
+"""
+import re
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Booking, BookingArchive, SeatHold, Show, Status
+from .pagination import keyset_condition
+
+# SQLite: "SCAN bookings_booking [USING ... INDEX]" walks the whole table or index;
+# an indexed lookup shows up as "SEARCH".
+_SQLITE_FULL_SCAN = re.compile(r"\bSCAN (?:TABLE )?(?!CONSTANT ROW)(\w+)")
+# PostgreSQL: "Seq Scan on bookings_booking"
+_POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+HOT_QUERIES = {
+    "my-bookings": lambda: Booking.objects.filter(user_id=1).order_by("-created_at", "-id")[:10],
+    # a later keyset page: the composite (created_at, id) condition must still use the index
+    "my-bookings-next-page": lambda: Booking.objects.filter(
+        keyset_condition(("-created_at", "-id"), [timezone.now(), 10**9]), user_id=1
+    ).order_by("-created_at", "-id")[:10],
+    "movie-shows": lambda: Show.objects.filter(movie_id=1).order_by("date_time", "id")[:10],
+    "seat-map": lambda: Booking.objects.filter(show_id=1, status=Status.BOOKED).values_list("seat_number"),
+    "seat-taken": lambda: Booking.objects.filter(show_id=1, seat_number="A1", status=Status.BOOKED),
+    "available-shows": lambda: Show.objects.filter(
+        date_time__gte=timezone.now(), booked_count__lte=F("total_seats") - 4
+    ).order_by("date_time", "id")[:10],
+    "reserve-seats": lambda: Show.objects.filter(pk=1),
+    "seat-held": lambda: SeatHold.objects.filter(show_id=1, seat_number__in=["A1"], expires_at__gt=timezone.now()),
+    "sweep-holds": lambda: SeatHold.objects.filter(expires_at__lte=timezone.now()),
+    "booking-export": lambda: Booking.objects.filter(
+        created_at__gte=timezone.now() - timedelta(days=1), created_at__lt=timezone.now()
+    ).order_by("created_at", "id"),
+    "my-bookings-archive": lambda: BookingArchive.objects.filter(user_id=1).order_by("-created_at", "-id")[:10],
+    "archive-batch": lambda: BookingArchive.archivable(timezone.now(), timezone.now())
+    .filter(pk__gt=0).order_by("pk")[:1000],
+}
+
+
+def full_scans(plan, vendor=None):
+    """Tables that `plan` (EXPLAIN output) reads with a full scan."""
+    vendor = vendor or connection.vendor
+    pattern = _POSTGRES_FULL_SCAN if vendor == "postgresql" else _SQLITE_FULL_SCAN
+    return sorted(set(pattern.findall(plan)))
+
+
+def explain_hot_queries(queries=None):
+    """Yield (name, plan, full_scanned_tables) for each hot query."""
+    queries = queries or HOT_QUERIES
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # small tables make seq scans cheaper; we want to know an index *exists*
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        for name, build in queries.items():
+            plan = build().explain()
+            yield name, plan, full_scans(plan)
@@ -0,0 +1,41 @@
+"""
+JSON rendering through orjson when it's installed (pip install orjson).
+
+FastJSONRenderer produces the same bytes as DRF's JSONRenderer for compact
+output: orjson's default is DRF's JSONEncoder.default, so datetimes, decimals,
+UUIDs and lazy strings come out exactly as before. Anything orjson won't take
+(indented output, ints over 64 bits, non-string keys), or a missing orjson,
+goes through JSONRenderer.
+
+Floats aren't formatted like the stdlib (1e-05 vs 1e-5), so this is only set on
+views whose payloads have none — the list endpoints in fastpath.py.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self._compact_output(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self._default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # same escaping as JSONRenderer, for embedding in <script>
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+    def _compact_output(self, accepted_media_type, renderer_context):
+        # orjson only writes compact, non-ASCII-escaped JSON
+        return (
+            self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        )
+
+    def _default(self, obj):
+        return self.encoder_class().default(obj)
@@ -0,0 +1,250 @@
+"""
+Per-show seat occupancy bitmap.
+
+Seat N (the numeric part of the seat number) is bit N-1 of a big-endian bitset,
+so seat 1 is the most significant bit of the first byte. The bitset is base64
+encoded — a 500 seat hall is 63 bytes / 84 characters.
+
+Shows with a SeatLayout number their seats row by row instead: seat "C4" of a
+20-seat-per-row layout is position 2 * 20 + 4 = 44. SeatIndex maps a layout's
+labels to positions; it is built once per layout and reused for validation,
+seat maps and seat searches.
+
+Maps are cached per show and dropped when a booking for the show is created
+or cancelled (see Booking._seats_changed).
+"""
+import base64
+import re
+import string
+from functools import lru_cache
+
+from django.core.cache import cache
+
+SEAT_MAP_ENCODING = "bitset-base64"
+SEAT_MAP_CACHE_TIMEOUT = 300  # seconds; also bounds staleness if an invalidation races a rebuild
+
+
+def seat_map_cache_key(show_id):
+    return f"bookings:seatmap:{show_id}"
+
+
+def invalidate_seat_map(show_id):
+    cache.delete(seat_map_cache_key(show_id))
+
+
+def invalidate_seat_maps(show_ids):
+    cache.delete_many([seat_map_cache_key(show_id) for show_id in show_ids])
+
+
+def encode_seats(seat_indexes, total_seats):
+    """Pack 1-based seat indexes into a base64 bitset of total_seats bits."""
+    bits = bytearray((total_seats + 7) // 8)
+    for n in seat_indexes:
+        if 1 <= n <= total_seats:
+            bits[(n - 1) // 8] |= 0x80 >> ((n - 1) % 8)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def decode_seats(encoded, total_seats):
+    """Inverse of encode_seats — returns the set of 1-based seat indexes that are set."""
+    bits = base64.b64decode(encoded)
+    return {
+        n for n in range(1, total_seats + 1)
+        if bits[(n - 1) // 8] & (0x80 >> ((n - 1) % 8))
+    }
+
+
+ROW_LETTERS = string.ascii_uppercase  # rows A..Z
+
+
+class SeatIndex:
+    """
+    The seats of one layout: `positions` maps every bookable label ("A1") to its
+    1-based position, so validating a seat is a single dict lookup. Positions of
+    blocked seats are in `blocked` and have no label in `positions`.
+    """
+    __slots__ = ("rows", "seats_per_row", "size", "positions", "blocked")
+
+    def __init__(self, rows, seats_per_row, blocked=""):
+        self.rows = rows
+        self.seats_per_row = seats_per_row
+        self.size = rows * seats_per_row
+        self.blocked = frozenset(decode_seats(blocked, self.size)) if blocked else frozenset()
+        self.positions = {
+            seat_label(position, seats_per_row): position
+            for position in range(1, self.size + 1)
+            if position not in self.blocked
+        }
+
+    @property
+    def capacity(self):
+        return len(self.positions)
+
+    def position(self, label):
+        """Position of a label anywhere in the grid (blocked or not), or None."""
+        row, number = ROW_LETTERS.find(label[:1]), label[1:]
+        if row < 0 or row >= self.rows or not number.isdigit() or not 1 <= int(number) <= self.seats_per_row:
+            return None
+        return row * self.seats_per_row + int(number)
+
+
+def seat_label(position, seats_per_row):
+    row, number = divmod(position - 1, seats_per_row)
+    return f"{ROW_LETTERS[row]}{number + 1}"
+
+
+@lru_cache(maxsize=128)
+def seat_index(rows, seats_per_row, blocked=""):
+    """SeatIndex for a layout, cached on its contents, so an edited layout simply gets a new one."""
+    return SeatIndex(rows, seats_per_row, blocked)
+
+
+def _map_grid(seat_map):
+    """(rows, seats per row, blocked bitset) of a seat map; a show without a layout is one row."""
+    layout = seat_map.get("layout")
+    if layout is None:
+        return 1, seat_map["total_seats"], ""
+    return layout["rows"], layout["seats_per_row"], layout["blocked"]
+
+
+def seat_positions(seat_map, labels):
+    """
+    Positions of seat labels in a seat map's numbering; labels that aren't seats of
+    the map are left out — including numbers past total_seats, e.g. a hold taken
+    before the show's capacity was lowered.
+    """
+    from .models import SEAT_PATTERN
+
+    rows, per_row, _blocked = _map_grid(seat_map)
+    if seat_map.get("layout") is None:
+        matches = (SEAT_PATTERN.match(label) for label in labels)
+        return [p for p in (int(m.group(2)) for m in matches if m) if 1 <= p <= rows * per_row]
+    grid = seat_index(rows, per_row)
+    return [p for p in map(grid.position, labels) if p is not None]
+
+
+@lru_cache(maxsize=256)
+def _occupancy(booked, blocked, size):
+    """The map as a "0"/"1" string, position p at index p-1; blocked seats count as taken."""
+    bits = int.from_bytes(base64.b64decode(booked), "big")
+    if blocked:
+        bits |= int.from_bytes(base64.b64decode(blocked), "big")
+    return format(bits, f"0{(size + 7) // 8 * 8}b")[:size]
+
+
+def find_best_seats(seat_map, n, ideal_row=0.6, row_weight=1.0, taken=()):
+    """
+    Labels of the best n adjacent free seats in one row of a seat map (see get_seat_map),
+    or [] if no row has n free in a row. Each row's free runs come from a regex over the
+    cached occupancy string, and each run's best block is the one nearest the row centre.
+    Blocks are ranked by
+        row_weight * |row - ideal_row| + |block centre - row centre|
+    with the row as a fraction from the front (0) to the back (1) and the offset as a
+    fraction of the row width. `taken` are extra positions to skip, e.g. held seats.
+    """
+    rows, per_row, blocked = _map_grid(seat_map)
+    occupancy = _occupancy(seat_map["booked"], blocked, rows * per_row)
+    if taken:
+        occupancy = list(occupancy)
+        for position in taken:
+            occupancy[position - 1] = "1"
+        occupancy = "".join(occupancy)
+
+    free_run = re.compile(f"0{{{n},}}")
+    centre = (per_row - n) / 2  # start of a block centred in its row
+    row_costs = sorted((row_weight * abs(r / max(rows - 1, 1) - ideal_row), r) for r in range(rows))
+    best = None
+    for row_cost, r in row_costs:
+        if best is not None and row_cost >= best[0]:
+            break  # rows are in cost order: nothing further down can win
+        for run in free_run.finditer(occupancy, r * per_row, (r + 1) * per_row):
+            start = min(max(round(centre), run.start() - r * per_row), run.end() - r * per_row - n)
+            cost = row_cost + abs(start - centre) / per_row
+            if best is None or cost < best[0]:
+                best = (cost, r * per_row + start)
+    if best is None:
+        return []
+    positions = range(best[1] + 1, best[1] + n + 1)
+    if seat_map.get("layout") is None:
+        return [str(p) for p in positions]
+    return [seat_label(p, per_row) for p in positions]
+
+
+def _seat_map_payload(show_id, show, seat_numbers):
+    from .models import SEAT_PATTERN
+
+    indexes = []
+    if show["layout_id"] is None:
+        for seat in seat_numbers:
+            m = SEAT_PATTERN.match(seat)
+            if m:
+                indexes.append(int(m.group(2)))
+        size = show["total_seats"]
+    else:
+        index = seat_index(show["layout__rows"], show["layout__seats_per_row"], show["layout__blocked"])
+        # seats booked before they were blocked still show up as booked
+        indexes = [p for p in map(index.position, seat_numbers) if p is not None]
+        size = index.size
+
+    payload = {
+        "show": show_id,
+        "total_seats": show["total_seats"],
+        "booked_count": len(indexes),
+        "encoding": SEAT_MAP_ENCODING,
+        "booked": encode_seats(indexes, size),
+    }
+    if show["layout_id"] is not None:
+        payload["layout"] = {
+            "rows": index.rows,
+            "seats_per_row": index.seats_per_row,
+            "blocked": encode_seats(index.blocked, size),
+        }
+    return payload
+
+
+def _seat_map_queries(show_id):
+    from .models import Booking, Show, Status
+
+    show = Show.objects.filter(pk=show_id).values(
+        "total_seats", "layout_id", "layout__rows", "layout__seats_per_row", "layout__blocked"
+    )
+    seats = Booking.objects.filter(show_id=show_id, status=Status.BOOKED).values_list("seat_number", flat=True)
+    return show, seats
+
+
+def build_seat_map(show_id):
+    """Build the seat map from the database: one query for the show and its layout, one values_list for its seats."""
+    show_qs, seats_qs = _seat_map_queries(show_id)
+    show = show_qs.first()
+    if show is None:
+        return None
+    return _seat_map_payload(show_id, show, seats_qs)
+
+
+async def abuild_seat_map(show_id):
+    show_qs, seats_qs = _seat_map_queries(show_id)
+    show = await show_qs.afirst()
+    if show is None:
+        return None
+    return _seat_map_payload(show_id, show, [seat async for seat in seats_qs.aiterator()])
+
+
+def get_seat_map(show_id):
+    """Cached seat map for a show, or None if the show doesn't exist."""
+    key = seat_map_cache_key(show_id)
+    seat_map = cache.get(key)
+    if seat_map is None:
+        seat_map = build_seat_map(show_id)
+        if seat_map is not None:
+            cache.set(key, seat_map, SEAT_MAP_CACHE_TIMEOUT)
+    return seat_map
+
+
+async def aget_seat_map(show_id):
+    key = seat_map_cache_key(show_id)
+    seat_map = await cache.aget(key)
+    if seat_map is None:
+        seat_map = await abuild_seat_map(show_id)
+        if seat_map is not None:
+            await cache.aset(key, seat_map, SEAT_MAP_CACHE_TIMEOUT)
+    return seat_map
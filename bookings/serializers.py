@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
-from .models import Movie, Show, Booking
+from .models import Movie, Show, Booking, SeatHold
 
 User = get_user_model()
 
@@ -26,27 +26,110 @@ class UserSignupSerializer(serializers.ModelSerializer):
         return user
 
 
+def parse_paths(value):
+    """
+    "show,show.movie,id" -> {"show": {"movie": {}}, "id": {}}.
+    Used for ?expand= and ?fields=; a dotted path also implies its parents.
+    """
+    tree = {}
+    for path in (value or "").split(","):
+        node = tree
+        for part in path.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def request_paths(request, name):
+    """?expand= / ?fields= of a DRF or plain Django request as a path tree."""
+    if request is None:
+        return {}
+    params = getattr(request, "query_params", request.GET)
+    return parse_paths(params.get(name))
+
+
+def related_paths(serializer_class, expand):
+    """select_related() arguments for what `expand` asks serializer_class to nest — nothing more."""
+    paths = []
+    for name, sub in expand.items():
+        child = serializer_class.expandable_fields.get(name)
+        if child is None:
+            continue
+        nested = related_paths(child, sub) if sub else []
+        paths += [f"{name}__{p}" for p in nested] or [name]
+    return paths
+
+
+def select_expanded(queryset, serializer_class, expand):
+    """queryset.select_related() for exactly the relations `expand` nests (a bare select_related() would follow all)."""
+    paths = related_paths(serializer_class, expand)
+    return queryset.select_related(*paths) if paths else queryset
+
+
+class FlexFieldsMixin:
+    """
+    Sparse fieldsets and opt-in nesting for read serializers.
+    - Foreign keys render as flat ids by default.
+    - ?expand=show,show.movie swaps a key in expandable_fields for its nested serializer.
+    - ?fields=id,show.screen_name keeps only the listed fields (dotted names reach into
+      expanded objects). Unknown names are ignored.
+    The root serializer reads both from the request in its context; nested ones get
+    their share as the `expand` / `fields` trees.
+    """
+    expandable_fields = {}  # field name -> FlexFieldsMixin serializer class
+
+    def __init__(self, *args, expand=None, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        self._expand = request_paths(request, "expand") if expand is None else expand
+        self._only = request_paths(request, "fields") if fields is None else fields
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name, sub_expand in self._expand.items():
+            child = self.expandable_fields.get(name)
+            if child is not None and name in fields:
+                fields[name] = child(read_only=True, expand=sub_expand, fields=self._only.get(name, {}))
+        if self._only:
+            fields = {name: field for name, field in fields.items() if name in self._only}
+        return fields
+
+
 # Read-only serializers for later use (no write logic here yet)
-class MovieSerializer(serializers.ModelSerializer):
+class MovieSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Movie
         fields = ["id", "title", "duration_minutes"]
 
 
-class ShowSerializer(serializers.ModelSerializer):
-    movie = MovieSerializer(read_only=True)
+class ShowSerializer(FlexFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {"movie": MovieSerializer}
 
     class Meta:
         model = Show
         fields = ["id", "movie", "screen_name", "date_time", "total_seats"]
 
 
+class AvailableShowSerializer(ShowSerializer):
+    free_seats = serializers.IntegerField(read_only=True)
 
+    class Meta(ShowSerializer.Meta):
+        fields = ShowSerializer.Meta.fields + ["free_seats"]
 
-class BookingSerializer(serializers.ModelSerializer):
-    show = ShowSerializer(read_only=True)
+
+class BookingSerializer(FlexFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {"show": ShowSerializer}
     status = serializers.CharField(source="get_status_display", read_only=True)
 
     class Meta:
         model = Booking
-        fields = ("id", "show", "seat_number", "status", "created_at")
\ No newline at end of file
+        fields = ("id", "show", "seat_number", "status", "created_at")
+
+
+class SeatHoldSerializer(FlexFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {"show": ShowSerializer}
+
+    class Meta:
+        model = SeatHold
+        fields = ("token", "show", "seat_number", "expires_at")
+        read_only_fields = fields
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import clear_user_cache
+from .listing_cache import availability_namespace, bump_version, movies_namespace, shows_namespace
+from .models import Movie, SeatLayout, Show
+from .seatmap import invalidate_seat_maps
+
+
+def _bump_on_commit(*namespaces):
+    def bump():
+        for namespace in namespaces:
+            bump_version(namespace)
+    transaction.on_commit(bump)
+
+
+@receiver([post_save, post_delete], sender=Movie)
+def movie_changed(sender, instance, **kwargs):
+    # show listings embed the movie, so they go stale too
+    _bump_on_commit(movies_namespace(), shows_namespace(instance.pk), availability_namespace())
+
+
+@receiver(pre_save, sender=Show)
+def remember_show_movie(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_movie_id = (
+            Show.objects.filter(pk=instance.pk).values_list("movie_id", flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Show)
+def show_changed(sender, instance, **kwargs):
+    namespaces = {shows_namespace(instance.movie_id), availability_namespace()}
+    previous = getattr(instance, "_previous_movie_id", None)
+    if previous is not None:
+        namespaces.add(shows_namespace(previous))
+    _bump_on_commit(*namespaces)
+
+
+@receiver(post_save, sender=SeatLayout)
+def layout_changed(sender, instance, **kwargs):
+    # its shows' capacity (bulk-updated in SeatLayout.save) and seat maps changed
+    shows = list(instance.shows.values_list("pk", "movie_id"))
+    if not shows:
+        return
+    _bump_on_commit(availability_namespace(), *{shows_namespace(movie_id) for _pk, movie_id in shows})
+    transaction.on_commit(lambda: invalidate_seat_maps([pk for pk, _movie_id in shows]))
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    # only this process's auth cache; other workers catch up within AUTH_USER_CACHE_TTL_SECONDS
+    clear_user_cache(instance.pk)
@@ -1,13 +1,68 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import F
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command, CommandError
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
 from datetime import timedelta
+from decimal import Decimal
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
-from .models import Movie, Show, Booking, Status
+from .admin import SeatLayoutForm
+from .authentication import (
+    ClaimsJWTAuthentication,
+    ClaimsTokenObtainPairSerializer,
+    clear_user_cache,
+    load_full_user,
+    user_from_claims,
+)
+from .models import Movie, Show, Booking, BookingArchive, BookingBusy, SeatHold, SeatLayout, Status
+from . import authentication, metrics
+from .db import apply_sqlite_pragmas
+from .bench import percentile, summarize
+from .fastpath import compile_plan
+from .listing_cache import (
+    bump_version, get_version, listing_cache_stats, movies_namespace, reset_listing_cache_stats, shows_namespace,
+)
+from .query_plans import full_scans
+from .renderers import FastJSONRenderer
+from .serializers import AvailableShowSerializer, BookingSerializer, MovieSerializer, ShowSerializer, parse_paths
+from .seatmap import decode_seats, encode_seats, find_best_seats, seat_positions
+from .views import MovieListView
 
 User = get_user_model()
 
+CLAIMS_REST_FRAMEWORK = {
+    **settings.REST_FRAMEWORK,
+    "DEFAULT_AUTHENTICATION_CLASSES": ("bookings.authentication.ClaimsJWTAuthentication",),
+}
+
+
+def with_claims_auth(obj):
+    """Run with ClaimsJWTAuthentication as the default authenticator (DRF views copy it at import)."""
+    obj = mock.patch.object(APIView, "authentication_classes", [ClaimsJWTAuthentication])(obj)
+    return override_settings(REST_FRAMEWORK=CLAIMS_REST_FRAMEWORK)(obj)
+
 
 class BookingModelTests(TestCase):
     def setUp(self):
@@ -44,9 +99,301 @@ class BookingModelTests(TestCase):
         b2 = Booking.create_booking(self.user, self.show, "1")
         self.assertEqual(b2.status, Status.BOOKED)
 
+    def test_booked_count_tracks_bookings_and_cancellations(self):
+        b = Booking.create_booking(self.user, self.show, "1")
+        Booking.create_booking(self.user, self.show, "2")
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_count, 2)
+        b.cancel()
+        b.cancel()  # idempotent, must not decrement twice
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.seats_booked_count(), 1)
+
+    def test_failed_booking_does_not_move_counter(self):
+        Booking.create_booking(self.user, self.show, "1")
+        with self.assertRaises(ValueError):
+            Booking.create_booking(self.user, self.show, "1")
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_count, 1)
+
+    def test_batch_books_all_seats(self):
+        bookings = Booking.create_bookings(self.user, self.show, ["1", "2"])
+        self.assertEqual(sorted(b.seat_number for b in bookings), ["1", "2"])
+        self.assertTrue(all(b.pk for b in bookings))
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_count, 2)
+
+    def test_batch_is_all_or_nothing(self):
+        Booking.create_booking(self.user, self.show, "1")
+        with self.assertRaises(ValueError):
+            Booking.create_bookings(self.user, self.show, ["2", "1"])
+        self.assertFalse(Booking.objects.filter(seat_number="2").exists())
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_count, 1)
+
+    def test_batch_rejects_duplicates_and_overcapacity(self):
+        with self.assertRaises(ValueError):
+            Booking.create_bookings(self.user, self.show, ["1", "1"])
+        Booking.create_booking(self.user, self.show, "1")
+        with self.assertRaisesMessage(ValueError, "Not enough seats"):
+            Booking.create_bookings(self.user, self.show, ["2", "A2"])
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+@override_settings(BOOKING_LOCKING="optimistic")
+class OptimisticBookingModelTests(BookingModelTests):
+    """Same guarantees as the pessimistic path, enforced by the constraint + conditional UPDATE."""
+
+    def test_full_show_rolls_back_inserted_booking(self):
+        Booking.create_booking(self.user, self.show, "1")
+        Booking.create_booking(self.user, self.show, "2")
+        Booking.objects.filter(seat_number="2").update(status=Status.CANCELLED)  # counter still says full
+        with self.assertRaisesMessage(ValueError, "fully booked"):
+            Booking.create_booking(self.user, self.show, "2")
+        self.assertEqual(Booking.objects.filter(status=Status.BOOKED).count(), 1)
+
+    def test_unknown_locking_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Booking.create_booking(self.user, self.show, "1", locking="yolo")
+
+
+class SyncBookedCountsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", password="Str0ngPass!123")
+        movie = Movie.objects.create(title="Counter Movie", duration_minutes=90)
+        self.show = Show.objects.create(
+            movie=movie,
+            screen_name="Screen 1",
+            date_time=timezone.now() + timedelta(days=1),
+            total_seats=5,
+        )
+        Booking.create_booking(self.user, self.show, "1")
+        Booking.create_booking(self.user, self.show, "2")
+
+    def test_check_passes_when_in_sync(self):
+        out = StringIO()
+        call_command("sync_booked_counts", "--check", stdout=out)
+        self.assertIn("in sync", out.getvalue())
+
+    def test_check_fails_on_drift_and_rebuild_fixes_it(self):
+        Show.objects.filter(pk=self.show.pk).update(booked_count=0)
+        with self.assertRaises(CommandError):
+            call_command("sync_booked_counts", "--check", stdout=StringIO())
+        call_command("sync_booked_counts", stdout=StringIO())
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_count, 2)
+
+
+class ImportScheduleCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.movie = Movie.objects.create(title="Known Movie", duration_minutes=100)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as fh:
+            fh.write(text)
+        return path
+
+    def test_csv_import_in_chunks(self):
+        rows = "".join(f"Known Movie,Screen {i},2030-01-01T{10 + i % 10}:00:00,{50 + i}\n" for i in range(25))
+        path = self._write("schedule.csv", "movie,screen_name,date_time,total_seats\n" + rows)
+        version = get_version(shows_namespace(self.movie.id))
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            call_command("import_schedule", path, "--batch-size", "4", "--chunk-size", "10", stdout=out)
+        self.assertEqual(len(callbacks), 3)  # one per chunk
+        self.assertEqual(Show.objects.filter(movie=self.movie).count(), 25)
+        self.assertEqual(Show.objects.get(screen_name="Screen 3").total_seats, 53)
+        self.assertTrue(timezone.is_aware(Show.objects.first().date_time))
+        self.assertGreater(get_version(shows_namespace(self.movie.id)), version)
+        self.assertIn("imported 25 show(s)", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+
+    def test_jsonl_import_creates_movies_once(self):
+        lines = [
+            {"movie": "New Movie", "duration_minutes": 95, "screen_name": "A", "date_time": "2030-01-01T10:00:00Z", "total_seats": 10},
+            {"movie": "New Movie", "screen_name": "B", "date_time": "2030-01-01T12:00:00Z", "total_seats": 10},
+            {"movie": "Known Movie", "screen_name": "C", "date_time": "2030-01-01T14:00:00Z", "total_seats": 10},
+        ]
+        path = self._write("schedule.jsonl", "\n".join(json.dumps(line) for line in lines) + "\n")
+        call_command("import_schedule", path, "--create-movies", stdout=StringIO())
+        new = Movie.objects.get(title="New Movie")
+        self.assertEqual(new.shows.count(), 2)
+        self.assertEqual(self.movie.shows.count(), 1)
+
+    def test_invalid_rows(self):
+        path = self._write("bad.csv", (
+            "movie,screen_name,date_time,total_seats\n"
+            "Known Movie,A,2030-01-01T10:00:00,10\n"
+            "Unknown Movie,B,2030-01-01T10:00:00,10\n"
+            "Known Movie,C,not a date,10\n"
+        ))
+        with self.assertRaisesMessage(CommandError, "line 3: unknown movie 'Unknown Movie'"):
+            call_command("import_schedule", path, stdout=StringIO())
+        self.assertFalse(Show.objects.exists())
+
+        err = StringIO()
+        call_command("import_schedule", path, "--skip-invalid", stdout=StringIO(), stderr=err)
+        self.assertEqual(list(Show.objects.values_list("screen_name", flat=True)), ["A"])
+        self.assertIn("line 4: date_time must be ISO 8601", err.getvalue())
+
+
+class BookingExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="ops", password="Str0ngPass!123", is_staff=True)
+        self.user = User.objects.create_user(username="fan", password="Str0ngPass!123")
+        movie = Movie.objects.create(title="Export, The Movie", duration_minutes=100)
+        other = Movie.objects.create(title="Other", duration_minutes=100)
+        self.show = Show.objects.create(movie=movie, screen_name="S1", date_time=timezone.now(), total_seats=10)
+        self.other_show = Show.objects.create(movie=other, screen_name="S2", date_time=timezone.now(), total_seats=10)
+        for seat in ("1", "2", "3"):
+            Booking.create_booking(self.user, self.show, seat)
+        Booking.create_booking(self.user, self.other_show, "1")
+        Booking.objects.filter(seat_number="3").update(created_at=timezone.now() - timedelta(days=2))
+        self.client = APIClient()
+
+    def _get(self, user, query=""):
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.client.get(f"/api/bookings/export/{query}")
+
+    def test_csv_export_streams_filtered_rows(self):
+        resp = self._get(self.admin, f"?movie={self.show.movie_id}")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp["Content-Type"], "text/csv; charset=utf-8")
+        with self.assertNumQueries(1):
+            lines = b"".join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,created_at,status,seat_number,user_id,username,show_id,show_time,screen,movie_id,movie")
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].endswith(f',{self.show.movie_id},"Export, The Movie"'))
+
+    def test_jsonl_export_by_show_and_created_range(self):
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        resp = self._get(self.admin, f"?output=jsonl&show={self.show.id}&created_from={since.replace('+', '%2B')}")
+        rows = [json.loads(line) for line in b"".join(resp.streaming_content).splitlines()]
+        self.assertEqual(sorted(r["seat_number"] for r in rows), ["1", "2"])
+        self.assertEqual(rows[0]["username"], "fan")
+
+    def test_export_includes_archived_bookings_on_request(self):
+        Booking.objects.get(show=self.show, seat_number="1").cancel()
+        BookingArchive.archive_batch(
+            cancelled_before=timezone.now() + timedelta(days=1), shows_before=timezone.now() - timedelta(days=30)
+        )
+        self.assertTrue(BookingArchive.objects.filter(seat_number="1", show=self.show).exists())
+
+        resp = self._get(self.admin, f"?output=jsonl&show={self.show.id}")
+        rows = [json.loads(line) for line in b"".join(resp.streaming_content).splitlines()]
+        self.assertEqual(sorted(r["seat_number"] for r in rows), ["2", "3"])
+
+        resp = self._get(self.admin, f"?output=jsonl&show={self.show.id}&include_archived=true")
+        with self.assertNumQueries(1):
+            rows = [json.loads(line) for line in b"".join(resp.streaming_content).splitlines()]
+        self.assertEqual([r["seat_number"] for r in rows], ["3", "1", "2"])  # created_at order across both tables
+        self.assertEqual(rows[1]["status"], "cancelled")
+        self.assertEqual(rows[1]["movie"], "Export, The Movie")
+
+        out = StringIO()
+        call_command("export_bookings", "--include-archived", f"--show={self.show.id}", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 4)  # header + 3
+
+    def test_csv_and_jsonl_agree_on_created_at_to_the_microsecond(self):
+        created = timezone.now().replace(microsecond=123456)
+        Booking.objects.update(created_at=created)
+        csv_rows = list(csv.DictReader(b"".join(self._get(self.admin).streaming_content).decode().splitlines()))
+        jsonl_rows = [json.loads(line) for line in b"".join(self._get(self.admin, "?output=jsonl").streaming_content).splitlines()]
+        self.assertEqual(len(csv_rows), len(jsonl_rows))
+        for csv_row, jsonl_row in zip(csv_rows, jsonl_rows):
+            self.assertEqual(parse_datetime(csv_row["created_at"]), created)
+            self.assertEqual(parse_datetime(jsonl_row["created_at"]), created)
+
+    def test_admin_only_and_validated(self):
+        self.assertEqual(self._get(self.user).status_code, 403)
+        self.assertEqual(self._get(self.admin, "?output=xml").status_code, 400)
+        self.assertEqual(self._get(self.admin, "?created_from=yesterday").status_code, 400)
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bookings.jsonl")
+            out = StringIO()
+            call_command("export_bookings", "--format", "jsonl", "--output", path, "--chunk-size", "2", stdout=out)
+            with open(path) as fh:
+                self.assertEqual(len(fh.readlines()), 4)
+        self.assertIn("wrote 4 booking(s)", out.getvalue())
+        out = StringIO()
+        call_command("export_bookings", "--show", str(self.other_show.id), stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+
+class ArchiveBookingsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="archiver", password="Str0ngPass!123")
+        movie = Movie.objects.create(title="Archive Movie", duration_minutes=90)
+        now = timezone.now()
+        self.past_show = Show.objects.create(movie=movie, screen_name="P", date_time=now - timedelta(days=40), total_seats=5)
+        self.show = Show.objects.create(movie=movie, screen_name="U", date_time=now + timedelta(days=1), total_seats=5)
+        self.past = Booking.create_booking(self.user, self.past_show, "1")
+        self.upcoming = Booking.create_booking(self.user, self.show, "1")
+        self.cancelled = Booking.create_booking(self.user, self.show, "2")
+        self.cancelled.cancel()
+        Booking.objects.filter(pk=self.cancelled.pk).update(created_at=now - timedelta(days=2))
+        self.fresh_cancel = Booking.create_booking(self.user, self.show, "3")
+        self.fresh_cancel.cancel()
+
+    def test_moves_past_show_and_old_cancelled_bookings_in_batches(self):
+        out = StringIO()
+        call_command("archive_bookings", "--batch-size", "1", stdout=out)
+        self.assertIn("archived 2 booking(s) in 2 batch(es)", out.getvalue())
+        self.assertEqual(set(Booking.objects.values_list("pk", flat=True)), {self.upcoming.pk, self.fresh_cancel.pk})
+        archived = BookingArchive.objects.get(pk=self.past.pk)
+        self.assertEqual(
+            (archived.user_id, archived.show_id, archived.seat_number, archived.status, archived.created_at),
+            (self.user.pk, self.past_show.pk, "1", Status.BOOKED, self.past.created_at),
+        )
+        self.assertTrue(BookingArchive.objects.filter(pk=self.cancelled.pk, status=Status.CANCELLED).exists())
+
+    def test_dry_run_and_max_batches(self):
+        out = StringIO()
+        call_command("archive_bookings", "--dry-run", stdout=out)
+        self.assertIn("would archive 2 booking(s)", out.getvalue())
+        self.assertFalse(BookingArchive.objects.exists())
+        call_command("archive_bookings", "--batch-size", "1", "--max-batches", "1", stdout=StringIO())
+        self.assertEqual(BookingArchive.objects.count(), 1)
+
+    def test_booked_counts_include_archived_bookings(self):
+        call_command("archive_bookings", stdout=StringIO())
+        out = StringIO()
+        call_command("sync_booked_counts", "--check", stdout=out)
+        self.assertIn("in sync", out.getvalue())
+
+    def test_my_bookings_history(self):
+        call_command("archive_bookings", stdout=StringIO())
+        client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        live = client.get("/api/my-bookings/")
+        self.assertEqual({b["id"] for b in live.data["results"]}, {self.upcoming.pk, self.fresh_cancel.pk})
+
+        history = client.get("/api/my-bookings/?history=true&expand=show.movie")
+        self.assertEqual(history.status_code, 200)
+        self.assertEqual(history.data["count"], 4)
+        results = history.data["results"]
+        self.assertEqual(
+            [b["id"] for b in results],
+            [self.fresh_cancel.pk, self.upcoming.pk, self.past.pk, self.cancelled.pk],  # newest first
+        )
+        self.assertEqual(results[3]["status"], "Cancelled")
+        self.assertEqual(results[2]["show"]["movie"]["title"], "Archive Movie")
+        self.assertEqual(client.get("/api/my-bookings/?history=maybe").status_code, 400)
+
 
 class BookingApiTests(TestCase):
     def setUp(self):
+        cache.clear()
         # Use DRF APIClient for auth convenience
         self.client = APIClient()
         # Create a movie+show to use in API tests
@@ -135,3 +482,1159 @@ class BookingApiTests(TestCase):
 
         cancel_resp = client2.post(f"/api/bookings/{booking_id}/cancel/")
         self.assertEqual(cancel_resp.status_code, 403, msg=f"Other user could cancel booking: {cancel_resp.content}")
+
+    def test_book_batch_endpoint(self):
+        user = User.objects.create_user(username="group", password=self.password)
+        self.client.force_authenticate(user)
+        url = f"/api/shows/{self.show.id}/book-batch/"
+
+        resp = self.client.post(url, {"seat_numbers": ["1", "2"]}, format="json")
+        self.assertEqual(resp.status_code, 201, msg=resp.content)
+        self.assertEqual(sorted(b["seat_number"] for b in resp.data), ["1", "2"])
+
+        resp = self.client.post(url, {"seat_numbers": ["1"]}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.post(url, {"seat_numbers": []}, format="json")
+        self.assertEqual(resp.status_code, 400)
+
+
+class SeatMapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="u1", password="Str0ngPass!123")
+        movie = Movie.objects.create(title="Seat Map Movie", duration_minutes=100)
+        self.show = Show.objects.create(
+            movie=movie,
+            screen_name="Screen 1",
+            date_time=timezone.now() + timedelta(days=1),
+            total_seats=500,
+        )
+        self.url = f"/api/shows/{self.show.id}/seats/"
+
+    def test_encoding_round_trip_and_size(self):
+        encoded = encode_seats([1, 9, 500], 500)
+        self.assertLess(len(encoded), 100)
+        self.assertEqual(decode_seats(encoded, 500), {1, 9, 500})
+
+    def test_seat_map_is_cached_and_invalidated_on_booking_and_cancel(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(decode_seats(resp.data["booked"], 500), set())
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            b = Booking.create_booking(self.user, self.show, "A7")
+        resp = self.client.get(self.url)
+        self.assertEqual(decode_seats(resp.data["booked"], 500), {7})
+        self.assertEqual(resp.data["booked_count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            b.cancel()
+        resp = self.client.get(self.url)
+        self.assertEqual(decode_seats(resp.data["booked"], 500), set())
+
+    def test_unknown_show_is_404(self):
+        self.assertEqual(self.client.get("/api/shows/999999/seats/").status_code, 404)
+
+
+class SeatLayoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="layout", password="Str0ngPass!123")
+        self.layout = SeatLayout(name="Screen 3", rows=3, seats_per_row=4)
+        self.layout.set_blocked(["b2"])
+        self.layout.save()
+        movie = Movie.objects.create(title="Layout Movie", duration_minutes=100)
+        self.show = Show.objects.create(
+            movie=movie, screen_name="Screen 3", date_time=timezone.now() + timedelta(days=1),
+            total_seats=999, layout=self.layout,
+        )
+
+    def test_layout_sets_capacity_and_index_is_cached(self):
+        self.assertEqual(self.show.total_seats, 11)
+        self.assertEqual(self.layout.blocked_labels(), ["B2"])
+        self.assertIs(self.layout.seat_index(), SeatLayout.objects.get(pk=self.layout.pk).seat_index())
+        with self.assertRaisesMessage(ValueError, "not in a 3x4 layout"):
+            self.layout.set_blocked(["D1"])
+
+    def test_validation_is_by_label(self):
+        self.assertEqual(Booking._validate_seat_number(self.show, " c4 "), "C4")
+        for seat in ["B2", "D1", "A5", "5", "A0", "AA1"]:
+            with self.subTest(seat=seat), self.assertRaises(ValidationError):
+                Booking._validate_seat_number(self.show, seat)
+        Booking.create_booking(self.user, self.show, "A1")
+        Booking.create_booking(self.user, self.show, "B1")  # a different seat, not "seat 1" again
+        with self.assertRaisesMessage(ValueError, "already booked"):
+            Booking.create_booking(self.user, self.show, "a1")
+
+    def test_seat_map_uses_layout_positions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.create_booking(self.user, self.show, "B1")
+        data = self.client.get(f"/api/shows/{self.show.id}/seats/").json()
+        self.assertEqual(decode_seats(data["booked"], 12), {5})
+        self.assertEqual(data["layout"]["rows"], 3)
+        self.assertEqual(decode_seats(data["layout"]["blocked"], 12), {6})
+        self.assertEqual(data["total_seats"], 11)
+
+    def test_editing_layout_updates_shows_and_seat_map(self):
+        self.client.get(f"/api/shows/{self.show.id}/seats/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.layout.set_blocked(["B2", "B3"])
+            self.layout.save()
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.total_seats, 10)
+        data = self.client.get(f"/api/shows/{self.show.id}/seats/").json()
+        self.assertEqual(decode_seats(data["layout"]["blocked"], 12), {6, 7})
+        available = self.client.get("/api/shows/available/?min_free=10").json()["results"]
+        self.assertEqual([s["free_seats"] for s in available], [10])
+
+    def test_admin_form_blocks_seats_by_label(self):
+        form = SeatLayoutForm(data={"name": "Screen 4", "rows": 2, "seats_per_row": 3, "blocked_seats": "A1, z9"})
+        self.assertFalse(form.is_valid())
+        self.assertIn("blocked_seats", form.errors)
+        form = SeatLayoutForm(data={"name": "Screen 4", "rows": 2, "seats_per_row": 3, "blocked_seats": "A1, b3"})
+        self.assertTrue(form.is_valid(), form.errors)
+        layout = form.save()
+        self.assertEqual(layout.blocked_labels(), ["A1", "B3"])
+        self.assertEqual(layout.capacity, 4)
+
+    async def test_async_booking_validates_against_layout(self):
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        client = AsyncClient()
+        url = f"/api/async/shows/{self.show.id}/book/"
+        headers = {"Authorization": f"Bearer {token}"}
+        resp = await client.post(url, {"seat_number": "C4"}, content_type="application/json", headers=headers)
+        self.assertEqual(resp.status_code, 201, msg=resp.content)
+        resp = await client.post(url, {"seat_number": "B2"}, content_type="application/json", headers=headers)
+        self.assertEqual(resp.status_code, 400)
+
+
+class BestSeatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="best", password="Str0ngPass!123")
+        self.other = User.objects.create_user(username="other", password="Str0ngPass!123")
+        layout = SeatLayout(name="Best Screen", rows=3, seats_per_row=6)
+        layout.set_blocked(["C2"])
+        layout.save()
+        movie = Movie.objects.create(title="Best Movie", duration_minutes=100)
+        self.show = Show.objects.create(
+            movie=movie, screen_name="Best Screen", date_time=timezone.now() + timedelta(days=1),
+            total_seats=0, layout=layout,
+        )
+        self.url = f"/api/shows/{self.show.id}/best-seats/"
+        self.client = APIClient()
+
+    def test_ranking(self):
+        seat_map = {"total_seats": 10, "booked": encode_seats([4, 5, 6], 10)}  # no layout: one row, numbered seats
+        self.assertEqual(find_best_seats(seat_map, 2), ["7", "8"])
+        self.assertEqual(find_best_seats(seat_map, 5), [])
+        self.assertEqual(find_best_seats(seat_map, 2, taken=[7, 8]), ["2", "3"])
+
+        layout = {"rows": 3, "seats_per_row": 6, "blocked": encode_seats([14], 18)}
+        seat_map = {"total_seats": 17, "booked": encode_seats([8, 9, 10, 11], 18), "layout": layout}
+        self.assertEqual(find_best_seats(seat_map, 2), ["C3", "C4"])  # B only has single seats left
+        self.assertEqual(find_best_seats(seat_map, 2, ideal_row=0), ["A3", "A4"])
+        self.assertEqual(find_best_seats(seat_map, 6), ["A1", "A2", "A3", "A4", "A5", "A6"])
+        self.assertEqual(find_best_seats(seat_map, 1, ideal_row=0.5), ["B1"])
+
+    def test_suggestions_come_from_cached_map(self):
+        self.assertEqual(self.client.get(self.url, {"n": 3}).data["seats"], ["B3", "B4", "B5"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, {"n": 6, "row": 1}).data["seats"], ["B1", "B2", "B3", "B4", "B5", "B6"])
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.create_bookings(self.other, self.show, ["B2", "B5"])
+        self.assertEqual(self.client.get(self.url, {"n": 3}).data["seats"], ["C3", "C4", "C5"])
+        self.assertEqual(self.client.get(self.url, {"n": 11}).status_code, 400)
+        self.assertEqual(self.client.get("/api/shows/999999/best-seats/", {"n": 2}).status_code, 404)
+
+    def test_post_books_best_seats_skipping_holds(self):
+        SeatHold.create_hold(self.other, self.show, "B4")
+        self.assertEqual(self.client.post(self.url, {"n": 2}, format="json").status_code, 401)
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(self.url, {"n": 2}, format="json")
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual([b["seat_number"] for b in resp.data], ["B2", "B3"])
+        self.assertNotIn("B2", self.client.get(self.url, {"n": 1}).data["seats"])
+        self.assertEqual(self.client.post(self.url, {"n": 7}, format="json").status_code, 400)
+
+    def test_post_ignores_holds_past_the_show_capacity(self):
+        movie = Movie.objects.create(title="Shrunk", duration_minutes=90)
+        show = Show.objects.create(movie=movie, screen_name="S", date_time=timezone.now() + timedelta(days=1), total_seats=20)
+        SeatHold.create_hold(self.other, show, "15")
+        Show.objects.filter(pk=show.pk).update(total_seats=10)  # capacity lowered while the hold is live
+        self.assertEqual(seat_positions({"total_seats": 10, "booked": ""}, ["15", "0", "3"]), [3])
+        self.client.force_authenticate(self.user)
+        resp = self.client.post(f"/api/shows/{show.id}/best-seats/", {"n": 2}, format="json")
+        self.assertEqual(resp.status_code, 201, resp.data)
+
+    def test_post_retries_when_the_cached_map_is_stale(self):
+        self.assertEqual(self.client.get(self.url, {"n": 2}).data["seats"], ["B3", "B4"])  # caches the map
+        Booking.create_bookings(self.other, self.show, ["B3", "B4"])  # on_commit never runs: the map stays stale
+        self.client.force_authenticate(self.user)
+        resp = self.client.post(self.url, {"n": 2}, format="json")
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual([b["seat_number"] for b in resp.data], ["C3", "C4"])
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Fixed query budgets per list endpoint — a nested serializer without a matching
+    select_related makes these grow with the page size and fail.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="budget", password="Str0ngPass!123")
+        cls.movie = Movie.objects.create(title="Budget Movie", duration_minutes=100)
+        for i in range(5):
+            movie = Movie.objects.create(title=f"Budget Movie {i}", duration_minutes=90)
+            show = Show.objects.create(
+                movie=movie,
+                screen_name=f"Screen {i}",
+                date_time=timezone.now() + timedelta(days=1, hours=i),
+                total_seats=10,
+            )
+            Show.objects.create(
+                movie=cls.movie,
+                screen_name=f"Screen {i}",
+                date_time=timezone.now() + timedelta(days=2, hours=i),
+                total_seats=10,
+            )
+            Booking.create_booking(cls.user, show, "1")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.auth_client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        self.auth_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_movies_list(self):
+        with self.assertNumQueries(2):  # count + page
+            resp = self.client.get("/api/movies/")
+        self.assertEqual(resp.data["count"], 6)
+
+    def test_movie_shows_list(self):
+        with self.assertNumQueries(2):  # movie exists + keyset page
+            resp = self.client.get(f"/api/movies/{self.movie.id}/shows/")
+        self.assertEqual(len(resp.data["results"]), 5)
+        with self.assertNumQueries(3):  # movie exists + count + page
+            self.client.get(f"/api/movies/{self.movie.id}/shows/?page=1")
+        with self.assertNumQueries(2):  # expanded movies come from the same page query
+            resp = self.client.get(f"/api/movies/{self.movie.id}/shows/?expand=movie")
+        self.assertEqual(resp.data["results"][0]["movie"]["title"], "Budget Movie")
+
+    @with_claims_auth
+    def test_my_bookings_list(self):
+        with self.assertNumQueries(1):  # keyset page; the user comes from token claims
+            resp = self.auth_client.get("/api/my-bookings/")
+        self.assertEqual(len(resp.data["results"]), 5)
+        with self.assertNumQueries(2):  # count + page
+            self.auth_client.get("/api/my-bookings/?page=1")
+        with self.assertNumQueries(1):  # show and movie joined into the page query
+            resp = self.auth_client.get("/api/my-bookings/?expand=show.movie")
+        self.assertEqual(len({b["show"]["movie"]["title"] for b in resp.data["results"]}), 5)
+
+    def test_default_authenticator_loads_the_user(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.auth_client.get("/api/auth/me/").data["username"], "budget")
+
+    def test_seat_map(self):
+        show = Show.objects.filter(movie=self.movie).first()
+        with self.assertNumQueries(2):  # show + seats
+            self.client.get(f"/api/shows/{show.id}/seats/")
+        with self.assertNumQueries(0):  # cached, and no user lookup even with a token
+            self.auth_client.get(f"/api/shows/{show.id}/seats/")
+
+
+@with_claims_auth
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        clear_user_cache()
+        self.user = User.objects.create_user(
+            username="claims", email="claims@a.com", password="Str0ngPass!123", first_name="Clay"
+        )
+        self.client = APIClient()
+
+    def _login(self):
+        resp = self.client.post(
+            "/api/auth/login/", {"username": "claims", "password": "Str0ngPass!123"}, format="json"
+        )
+        self.assertEqual(resp.status_code, 200)
+        return resp.data["access"]
+
+    def test_me_answers_from_claims(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self._login()}")
+        with self.assertNumQueries(0):
+            resp = self.client.get("/api/auth/me/")
+        self.assertEqual(resp.data, {"id": self.user.id, "username": "claims", "email": "claims@a.com"})
+
+    def test_claims_user_loads_other_fields_on_demand(self):
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        user = user_from_claims(token)
+        self.assertEqual(user, self.user)
+        self.assertIn("first_name", user.get_deferred_fields())
+        with self.assertNumQueries(1):
+            load_full_user(user)
+            self.assertEqual(user.first_name, "Clay")
+            self.assertTrue(user.check_password("Str0ngPass!123"))
+
+    def test_claims_user_books_and_cancels(self):
+        movie = Movie.objects.create(title="Claims Movie", duration_minutes=100)
+        show = Show.objects.create(
+            movie=movie, screen_name="S1", date_time=timezone.now() + timedelta(days=1), total_seats=5
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self._login()}")
+        resp = self.client.post(f"/api/shows/{show.id}/book/", {"seat_number": "1"}, format="json")
+        self.assertEqual(resp.status_code, 201, msg=resp.data)
+        resp = self.client.post(f"/api/bookings/{resp.data['id']}/cancel/")
+        self.assertEqual(resp.status_code, 200, msg=resp.data)
+
+    def test_token_without_claims_uses_user_cache(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        with self.assertNumQueries(1):
+            self.client.get("/api/auth/me/")
+        with self.assertNumQueries(0):
+            resp = self.client.get("/api/auth/me/")
+        self.assertEqual(resp.data["email"], "claims@a.com")
+
+        self.user.email = "new@a.com"
+        self.user.save()  # drops the cached entry
+        with self.assertNumQueries(1):
+            resp = self.client.get("/api/auth/me/")
+        self.assertEqual(resp.data["email"], "new@a.com")
+
+    @override_settings(AUTH_USER_CACHE_MAX_ENTRIES=2)
+    def test_user_cache_is_bounded(self):
+        users = [self.user] + [
+            User.objects.create_user(username=f"cached{i}", password="Str0ngPass!123") for i in range(2)
+        ]
+        tokens = [f"Bearer {RefreshToken.for_user(user).access_token}" for user in users]
+        for token in tokens[:2]:
+            self.client.get("/api/auth/me/", HTTP_AUTHORIZATION=token)
+        self.client.get("/api/auth/me/", HTTP_AUTHORIZATION=tokens[0])  # most recently used now
+        self.client.get("/api/auth/me/", HTTP_AUTHORIZATION=tokens[2])  # evicts users[1]
+        self.assertEqual(list(authentication._user_cache), [users[0].pk, users[2].pk])
+        with self.assertNumQueries(0):
+            self.client.get("/api/auth/me/", HTTP_AUTHORIZATION=tokens[0])
+        with self.assertNumQueries(1):
+            self.client.get("/api/auth/me/", HTTP_AUTHORIZATION=tokens[1])
+
+    def _refresh(self, refresh):
+        return self.client.post("/api/auth/token/refresh/", {"refresh": refresh}, format="json")
+
+    def test_refresh_rejects_inactive_users_and_reissues_current_claims(self):
+        resp = self.client.post("/api/auth/login/", {"username": "claims", "password": "Str0ngPass!123"}, format="json")
+        refresh = resp.data["refresh"]
+        User.objects.filter(pk=self.user.pk).update(email="moved@a.com")
+        resp = self._refresh(refresh)
+        self.assertEqual(resp.status_code, 200)
+        access = AccessToken(resp.data["access"])
+        self.assertEqual(access["email"], "moved@a.com")
+        self.assertNotIn("is_staff", access.payload)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self._refresh(refresh).status_code, 401)
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertEqual(self._refresh(refresh).status_code, 401)
+
+    def test_staff_access_is_checked_against_the_database(self):
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self._login()}")
+        self.assertEqual(self.client.get("/api/_stats/").status_code, 200)
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+        self.assertEqual(self.client.get("/api/_stats/").status_code, 403)
+        self.assertEqual(self.client.get("/api/bookings/export/").status_code, 403)
+        User.objects.filter(pk=self.user.pk).update(is_staff=True, is_active=False)
+        self.assertEqual(self.client.get("/api/_stats/").status_code, 403)
+
+    def test_forged_staff_claim_is_ignored(self):
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        token["is_staff"] = token["is_superuser"] = True
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(self.client.get("/api/_stats/").status_code, 403)
+
+    @override_settings(AUTH_USER_CACHE_TTL_SECONDS=0)
+    def test_inactive_user_is_rejected_without_claims(self):
+        token = RefreshToken.for_user(self.user).access_token
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="sparse", password="Str0ngPass!123")
+        self.movie = Movie.objects.create(title="Sparse Movie", duration_minutes=100)
+        self.show = Show.objects.create(
+            movie=self.movie, screen_name="S1", date_time=timezone.now() + timedelta(days=1), total_seats=5
+        )
+        self.booking = Booking.create_booking(self.user, self.show, "1")
+        self.client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _first(self, query=""):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(f"/api/my-bookings/{query}")
+        return resp.data["results"][0], ctx.captured_queries[-1]["sql"]
+
+    def test_flat_ids_by_default(self):
+        booking, sql = self._first()
+        self.assertEqual(booking["show"], self.show.id)
+        self.assertNotIn("JOIN", sql)
+
+    def test_expand_joins_only_what_is_nested(self):
+        booking, sql = self._first("?expand=show")
+        self.assertEqual(booking["show"]["movie"], self.movie.id)
+        self.assertIn('"bookings_show"', sql)
+        self.assertNotIn('"bookings_movie"', sql)
+
+        booking, sql = self._first("?expand=show.movie")
+        self.assertEqual(booking["show"]["movie"]["title"], "Sparse Movie")
+        self.assertIn('"bookings_movie"', sql)
+
+    def test_fields_prunes_top_level_and_expanded_objects(self):
+        booking, _ = self._first("?fields=id,status")
+        self.assertEqual(booking, {"id": self.booking.id, "status": "Booked"})
+        booking, _ = self._first("?expand=show.movie&fields=seat_number,show.movie.title,unknown")
+        self.assertEqual(booking, {"seat_number": "1", "show": {"movie": {"title": "Sparse Movie"}}})
+
+    def test_booking_response_expansion(self):
+        resp = self.client.post(f"/api/shows/{self.show.id}/book/?expand=show.movie", {"seat_number": "2"}, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["show"]["movie"]["title"], "Sparse Movie")
+        resp = self.client.post(f"/api/shows/{self.show.id}/book/", {"seat_number": "3"}, format="json")
+        self.assertEqual(resp.data["show"], self.show.id)
+
+
+class FastPathTests(TestCase):
+    """The values() fast path must render byte-for-byte what the serializers do."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="fast", password="Str0ngPass!123")
+        self.movie = Movie.objects.create(title="Amélie \u2028 \"quoted\"", duration_minutes=122)
+        self.show = Show.objects.create(
+            movie=self.movie, screen_name="Salle 1", date_time=timezone.now() + timedelta(days=1, microseconds=7),
+            total_seats=5,
+        )
+        Booking.create_booking(self.user, self.show, "1")
+        Booking.create_booking(self.user, self.show, "2").cancel()
+        self.client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _assert_same(self, serializer_class, queryset, expand="", fields=""):
+        expand, fields = parse_paths(expand), parse_paths(fields)
+        expected = JSONRenderer().render(serializer_class(queryset, many=True, expand=expand, fields=fields).data)
+        plan = compile_plan(serializer_class, expand, fields)
+        self.assertEqual(FastJSONRenderer().render(plan.dump_many(queryset.values(*plan.paths))), expected)
+
+    def test_plans_match_serializers(self):
+        bookings = Booking.objects.order_by("id")
+        for expand, fields in [("", ""), ("show", ""), ("show.movie", ""), ("show.movie", "id,show.movie.title"),
+                               ("", "status,created_at"), ("nope", "nope")]:
+            with self.subTest(expand=expand, fields=fields):
+                self._assert_same(BookingSerializer, bookings, expand, fields)
+        self._assert_same(MovieSerializer, Movie.objects.all())
+        self._assert_same(ShowSerializer, Show.objects.all(), "movie")
+        shows = Show.objects.annotate(free_seats=F("total_seats") - F("booked_count"))
+        self._assert_same(AvailableShowSerializer, shows, "movie", "free_seats,movie.title,date_time")
+
+    def test_plans_are_cached(self):
+        self.assertIs(
+            compile_plan(BookingSerializer, parse_paths("show.movie"), {}),
+            compile_plan(BookingSerializer, parse_paths("show,show.movie"), {}),
+        )
+
+    def test_views_match_serializer_output(self):
+        cases = [
+            ("/api/my-bookings/?expand=show.movie", BookingSerializer,
+             Booking.objects.order_by("-created_at", "-id")),
+            ("/api/my-bookings/?page=1&fields=id,status", BookingSerializer,
+             Booking.objects.order_by("-created_at", "-id")),
+            ("/api/movies/", MovieSerializer, Movie.objects.order_by("title")),
+            (f"/api/movies/{self.movie.id}/shows/?expand=movie", ShowSerializer, Show.objects.order_by("date_time")),
+        ]
+        for url, serializer_class, queryset in cases:
+            with self.subTest(url=url):
+                resp = self.client.get(url)
+                self.assertEqual(resp.status_code, 200)
+                request = resp.wsgi_request
+                request.query_params = request.GET
+                data = serializer_class(queryset, many=True, context={"request": request}).data
+                self.assertEqual(resp.content, JSONRenderer().render({**resp.data, "results": data}))
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            "when": timezone.now(), "day": timezone.now().date(), "price": Decimal("12.50"),
+            "id": uuid.uuid4(), "text": "naïve \u2028\u2029 </script>", "big": 2 ** 70, "nested": [None, True, 1],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+        indented = FastJSONRenderer().render(data, "application/json; indent=2")
+        self.assertEqual(indented, JSONRenderer().render(data, "application/json; indent=2"))
+
+    def test_renderer_falls_back_without_orjson(self):
+        data = {"when": timezone.now(), "text": "é"}
+        with mock.patch("bookings.renderers.orjson", None):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_bench_command_reports_identical_output_and_rolls_back(self):
+        out = StringIO()
+        call_command("bench_serializers", "--rows", "20", "--repeat", "2", stdout=out)
+        self.assertIn("identical output: True", out.getvalue())
+        self.assertEqual(Booking.objects.count(), 2)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="pager", password="Str0ngPass!123")
+        self.client.force_authenticate(self.user)
+        self.movie = Movie.objects.create(title="Pager Movie", duration_minutes=100)
+        same_time = timezone.now() + timedelta(days=1)
+        for i in range(7):
+            # identical date_time on purpose: ties must not repeat or drop rows
+            show = Show.objects.create(movie=self.movie, screen_name=f"S{i}", date_time=same_time, total_seats=5)
+            Booking.create_booking(self.user, show, "1")
+
+    def _walk(self, url):
+        ids = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotIn("count", resp.data)
+            ids += [row["id"] for row in resp.data["results"]]
+            url = resp.data["next"]
+        return ids
+
+    def test_cursor_walks_every_booking_once_newest_first(self):
+        ids = self._walk("/api/my-bookings/?page_size=3")
+        expected = list(Booking.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_cursor_walks_shows_with_tied_date_time(self):
+        ids = self._walk(f"/api/movies/{self.movie.id}/shows/?page_size=3")
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 7)
+
+    def test_cursor_is_a_composite_keyset_without_offset(self):
+        Booking.objects.update(created_at=timezone.now())  # every row ties on created_at
+        expected = list(Booking.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._walk("/api/my-bookings/?page_size=2"), expected)
+        self.assertFalse([q["sql"] for q in queries if "OFFSET" in q["sql"]])
+
+        # and back again through the previous links
+        url, pages = "/api/my-bookings/?page_size=2", []
+        while url:
+            resp = self.client.get(url)
+            pages.append([row["id"] for row in resp.data["results"]])
+            url = resp.data["next"]
+        ids, url = [], resp.data["previous"]
+        while url:
+            resp = self.client.get(url)
+            ids = [row["id"] for row in resp.data["results"]] + ids
+            url = resp.data["previous"]
+        self.assertEqual(ids, expected[:-len(pages[-1])])
+
+    def test_bad_cursor_is_a_404(self):
+        for cursor in ("garbage", "WzFd", "W1siYSIsImIiXSwwXQ=="):  # not base64 json / wrong shape / bad values
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(f"/api/my-bookings/?cursor={cursor}").status_code, 404)
+
+    def test_page_param_falls_back_to_page_numbers(self):
+        resp = self.client.get("/api/my-bookings/?page=2&page_size=3")
+        self.assertEqual(resp.data["count"], 7)
+        self.assertEqual(len(resp.data["results"]), 3)
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertNotIn("full scan", out.getvalue())
+
+    def test_full_scan_detection(self):
+        self.assertEqual(full_scans("3 0 0 SCAN bookings_booking", "sqlite"), ["bookings_booking"])
+        self.assertEqual(full_scans("SEARCH bookings_booking USING INDEX idx (user_id=?)", "sqlite"), [])
+        self.assertEqual(full_scans("Seq Scan on bookings_show  (cost=0.00..1.05)", "postgresql"), ["bookings_show"])
+        self.assertEqual(full_scans("Index Scan using show_movie_date_idx on bookings_show", "postgresql"), [])
+
+
+class ListingCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_listing_cache_stats()
+        self.client = APIClient()
+        self.movie = Movie.objects.create(title="Cached Movie", duration_minutes=100)
+        self.show = Show.objects.create(
+            movie=self.movie, screen_name="S1", date_time=timezone.now() + timedelta(days=1), total_seats=5
+        )
+
+    def test_movies_served_from_cache_until_a_movie_changes(self):
+        self.assertEqual(self.client.get("/api/movies/")["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            resp = self.client.get("/api/movies/")
+        self.assertEqual(resp["X-Cache"], "HIT")
+        self.assertEqual(resp.data["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.create(title="Another", duration_minutes=90)
+        resp = self.client.get("/api/movies/")
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(resp.data["count"], 2)
+        self.assertEqual(listing_cache_stats()["movies"], {"hit": 1, "miss": 2, "not_modified": 0})
+
+    def test_show_listing_keyed_by_filter_and_invalidated_by_show_and_movie_changes(self):
+        url = f"/api/movies/{self.movie.id}/shows/"
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        self.assertEqual(self.client.get(url + "?from=2000-01-01T00:00:00Z")["X-Cache"], "MISS")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.show.screen_name = "Renamed"
+            self.show.save()
+        resp = self.client.get(url)
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(resp.data["results"][0]["screen_name"], "Renamed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.title = "Retitled"
+            self.movie.save()
+        resp = self.client.get(url + "?expand=movie")
+        self.assertEqual(resp.data["results"][0]["movie"]["title"], "Retitled")
+
+    def test_conditional_get_answers_304_without_queries(self):
+        resp = self.client.get("/api/movies/")
+        etag, last_modified = resp["ETag"], resp["Last-Modified"]
+        self.assertIn("no-cache", resp["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            resp = self.client.get("/api/movies/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b"")
+        self.assertEqual(resp["ETag"], etag)
+        self.assertEqual(self.client.get("/api/movies/", HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(listing_cache_stats()["movies"]["not_modified"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.create(title="Another", duration_minutes=90)
+        resp = self.client.get("/api/movies/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_conditional_get_never_hides_a_404(self):
+        future = http_date(time.time() + 3600)
+        self.assertEqual(self.client.get("/api/movies/999999/shows/", HTTP_IF_MODIFIED_SINCE=future).status_code, 404)
+
+        url = f"/api/movies/{self.movie.id}/shows/"
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=future).status_code, 404)
+        etag = f'"{get_version(shows_namespace(self.movie.id))}-json"'  # even with the current version's ETag
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+    def test_expired_page_still_answers_304(self):
+        with mock.patch.object(MovieListView, "cache_timeout", 0):  # pages expire at once
+            etag = self.client.get("/api/movies/")["ETag"]
+            with self.assertNumQueries(2):  # rebuilt, then found unchanged
+                resp = self.client.get("/api/movies/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+
+    def test_changes_within_one_second_move_last_modified(self):
+        now_ms = get_version(movies_namespace())
+        resp = self.client.get("/api/movies/")
+        last_modified = resp["Last-Modified"]
+        with mock.patch("bookings.listing_cache._now_ms", return_value=now_ms + 1):  # the clock hasn't ticked over
+            bump_version(movies_namespace())
+            self.assertEqual(self.client.get("/api/movies/", HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+            resp = self.client.get("/api/movies/")
+            self.assertNotEqual(resp["Last-Modified"], last_modified)
+            bump_version(movies_namespace())
+            self.assertEqual(
+                self.client.get("/api/movies/", HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"]).status_code, 200
+            )
+
+    def test_show_listing_etag_is_per_movie(self):
+        url = f"/api/movies/{self.movie.id}/shows/"
+        etag = self.client.get(url)["ETag"]
+        other = Movie.objects.create(title="Other", duration_minutes=80)
+        with self.captureOnCommitCallbacks(execute=True):
+            Show.objects.create(movie=other, screen_name="S9", date_time=timezone.now(), total_seats=5)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Show.objects.create(movie=self.movie, screen_name="S2", date_time=timezone.now(), total_seats=5)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertFalse(self.client.get("/api/shows/available/").has_header("ETag"))
+
+    def test_moving_a_show_invalidates_both_movies(self):
+        other = Movie.objects.create(title="Other", duration_minutes=80)
+        url = f"/api/movies/{self.movie.id}/shows/"
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.show.movie = other
+            self.show.save()
+        self.assertEqual(self.client.get(url).data["results"], [])
+
+
+class AvailableShowsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="avail", password="Str0ngPass!123")
+        self.movie = Movie.objects.create(title="Avail Movie", duration_minutes=100)
+        other = Movie.objects.create(title="Other Movie", duration_minutes=100)
+        now = timezone.now()
+        self.past = Show.objects.create(movie=self.movie, screen_name="past", date_time=now - timedelta(hours=1), total_seats=10)
+        self.tonight = Show.objects.create(movie=self.movie, screen_name="tonight", date_time=now + timedelta(hours=2), total_seats=5)
+        self.tomorrow = Show.objects.create(movie=other, screen_name="tomorrow", date_time=now + timedelta(days=1), total_seats=10)
+        for seat in ("1", "2"):
+            Booking.create_booking(self.user, self.tonight, seat)
+
+    def _names(self, resp):
+        return [(s["screen_name"], s["free_seats"]) for s in resp.data["results"]]
+
+    def test_free_seat_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            resp = self.client.get("/api/shows/available/?expand=movie")
+        self.assertEqual(self._names(resp), [("tonight", 3), ("tomorrow", 10)])
+        self.assertEqual(resp.data["results"][0]["movie"]["title"], "Avail Movie")
+
+    def test_filters(self):
+        self.assertEqual(self._names(self.client.get("/api/shows/available/?min_free=4")), [("tomorrow", 10)])
+        self.assertEqual(self._names(self.client.get(f"/api/shows/available/?movie={self.movie.id}")), [("tonight", 3)])
+        to = (timezone.now() + timedelta(hours=12)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.assertEqual(self._names(self.client.get(f"/api/shows/available/?to={to}")), [("tonight", 3)])
+        frm = (timezone.now() - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.assertEqual(len(self.client.get(f"/api/shows/available/?from={frm}").data["results"]), 3)
+        self.assertEqual(self.client.get("/api/shows/available/?min_free=0").status_code, 400)
+
+    def test_cached_and_invalidated_by_show_changes(self):
+        self.client.get("/api/shows/available/")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/shows/available/")["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tomorrow.total_seats = 20
+            self.tomorrow.save()
+        resp = self.client.get("/api/shows/available/")
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(self._names(resp)[1], ("tomorrow", 20))
+
+
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="Str0ngPass!123")
+        self.bob = User.objects.create_user(username="bob", password="Str0ngPass!123")
+        movie = Movie.objects.create(title="Hold Movie", duration_minutes=100)
+        self.show = Show.objects.create(
+            movie=movie, screen_name="S1", date_time=timezone.now() + timedelta(days=1), total_seats=5
+        )
+
+    def test_hold_blocks_others_and_converts_to_booking(self):
+        hold = SeatHold.create_hold(self.alice, self.show, "a3")
+        self.assertEqual(hold.seat_number, "A3")
+        with self.assertRaisesMessage(ValueError, "on hold"):
+            Booking.create_booking(self.bob, self.show, "A3")
+        with self.assertRaisesMessage(ValueError, "on hold"):
+            SeatHold.create_hold(self.bob, self.show, "A3")
+
+        booking = Booking.create_booking_from_hold(self.alice, self.show, hold.token)
+        self.assertEqual(booking.seat_number, "A3")
+        self.assertFalse(SeatHold.objects.exists())
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_count, 1)
+        with self.assertRaisesMessage(ValueError, "invalid or has expired"):
+            Booking.create_booking_from_hold(self.alice, self.show, hold.token)
+
+    def test_holding_again_extends_the_same_hold(self):
+        first = SeatHold.create_hold(self.alice, self.show, "1")
+        second = SeatHold.create_hold(self.alice, self.show, "1")
+        self.assertEqual(first.token, second.token)
+        self.assertGreaterEqual(second.expires_at, first.expires_at)
+
+    @override_settings(BOOKING_HOLD_TTL_SECONDS=300, BOOKING_HOLD_MAX_SECONDS=600)
+    def test_renewals_stop_at_the_max_hold_time(self):
+        hold = SeatHold.create_hold(self.alice, self.show, "1")
+        start, limit = hold.created_at, hold.created_at + timedelta(seconds=600)
+        with mock.patch("django.utils.timezone.now", return_value=start + timedelta(seconds=250)):
+            self.assertEqual(SeatHold.create_hold(self.alice, self.show, "1").expires_at, start + timedelta(seconds=550))
+        with mock.patch("django.utils.timezone.now", return_value=start + timedelta(seconds=500)):
+            renewed = SeatHold.create_hold(self.alice, self.show, "1")
+            self.assertEqual(renewed.token, hold.token)
+            self.assertEqual(renewed.expires_at, limit)  # not +800s
+        with mock.patch("django.utils.timezone.now", return_value=limit - timedelta(seconds=1)):
+            self.assertEqual(SeatHold.create_hold(self.alice, self.show, "1").expires_at, limit)
+        with mock.patch("django.utils.timezone.now", return_value=limit):
+            # expired for good: the seat is free for anyone
+            self.assertEqual(SeatHold.create_hold(self.bob, self.show, "1").user, self.bob)
+
+    @override_settings(BOOKING_MAX_HOLDS_PER_SHOW=2)
+    def test_holds_per_user_and_show_are_capped(self):
+        SeatHold.create_hold(self.alice, self.show, "1")
+        SeatHold.create_hold(self.alice, self.show, "2")
+        with self.assertRaisesMessage(ValueError, "at most 2 seats"):
+            SeatHold.create_hold(self.alice, self.show, "3")
+        SeatHold.create_hold(self.alice, self.show, "2")  # renewing an existing hold is fine
+        SeatHold.create_hold(self.bob, self.show, "3")  # per user
+
+        other = Show.objects.create(movie=self.show.movie, screen_name="S2", date_time=self.show.date_time, total_seats=5)
+        SeatHold.create_hold(self.alice, other, "1")  # per show
+
+        SeatHold.objects.filter(seat_number="1", show=self.show).update(expires_at=timezone.now())
+        SeatHold.create_hold(self.alice, self.show, "4")  # expired holds don't count
+
+    def test_expired_holds_do_not_block_and_are_swept(self):
+        hold = SeatHold.create_hold(self.alice, self.show, "1")
+        SeatHold.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        with self.assertRaisesMessage(ValueError, "invalid or has expired"):
+            Booking.create_booking_from_hold(self.alice, self.show, hold.token)
+        SeatHold.create_hold(self.bob, self.show, "2")
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+        call_command("sweep_holds", stdout=out)
+        self.assertIn("swept 2", out.getvalue())
+        Booking.create_booking(self.bob, self.show, "1")
+
+    def test_hold_api_flow(self):
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        resp = client.post(f"/api/shows/{self.show.id}/hold/", {"seat_number": "4"}, format="json")
+        self.assertEqual(resp.status_code, 201, msg=resp.content)
+        token = resp.data["token"]
+
+        resp = client.post(f"/api/shows/{self.show.id}/book/", {"hold_token": token}, format="json")
+        self.assertEqual(resp.status_code, 201, msg=resp.content)
+        self.assertEqual(resp.data["seat_number"], "4")
+        self.assertEqual(client.post(f"/api/shows/{self.show.id}/book/", {}, format="json").status_code, 400)
+
+
+class BookingRetryTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.user = User.objects.create_user(username="retry", password="Str0ngPass!123")
+        movie = Movie.objects.create(title="Retry Movie", duration_minutes=100)
+        self.show = Show.objects.create(
+            movie=movie, screen_name="S1", date_time=timezone.now() + timedelta(days=1), total_seats=5
+        )
+
+    def test_jittered_backoff_is_bounded_and_recorded(self):
+        with mock.patch.object(Booking, "_create_booking_locked", side_effect=IntegrityError), \
+                mock.patch("bookings.models.time.sleep") as sleep:
+            with self.assertRaisesMessage(ValueError, "concurrent requests"):
+                Booking.create_booking(self.user, self.show, "1", max_retries=4, retry_delay=0.1)
+        waits = [c.args[0] for c in sleep.call_args_list]
+        self.assertEqual(len(waits), 3)
+        for attempt, wait in enumerate(waits, start=1):
+            self.assertLessEqual(wait, 0.1 * 2 ** (attempt - 1))
+        stats = metrics.snapshot()
+        self.assertEqual(stats["booking.retries"], 3)
+        self.assertEqual(stats["booking.retry_exhausted"], 1)
+        self.assertAlmostEqual(stats["booking.retry_wait_seconds"], sum(waits))
+
+    def test_deadline_stops_retries(self):
+        with mock.patch.object(Booking, "_create_booking_locked", side_effect=IntegrityError), \
+                mock.patch("bookings.models.time.sleep") as sleep:
+            with self.assertRaises(ValueError):
+                Booking.create_booking(self.user, self.show, "1", max_retries=10, deadline=0)
+        sleep.assert_not_called()
+
+    async def test_async_booking_endpoint(self):
+        token = RefreshToken.for_user(self.user).access_token
+        client = AsyncClient()
+        url = f"/api/async/shows/{self.show.id}/book/?expand=show.movie"
+        headers = {"Authorization": f"Bearer {token}"}
+
+        resp = await client.post(url, {"seat_number": "2"}, content_type="application/json", headers=headers)
+        self.assertEqual(resp.status_code, 201, msg=resp.content)
+        self.assertEqual(resp.json()["show"]["movie"]["title"], "Retry Movie")
+
+        resp = await client.post(url, {"seat_number": "2"}, content_type="application/json", headers=headers)
+        self.assertEqual(resp.status_code, 400)
+        resp = await client.post(url, {"seat_number": "3"}, content_type="application/json")
+        self.assertEqual(resp.status_code, 401)
+
+    async def test_async_backoff_yields_to_event_loop(self):
+        with mock.patch.object(Booking, "_create_booking_locked", side_effect=IntegrityError), \
+                mock.patch("bookings.models.asyncio.sleep") as asleep, \
+                mock.patch("bookings.models.time.sleep") as sleep:
+            with self.assertRaises(ValueError):
+                await Booking.acreate_booking(self.user, self.show, "1", max_retries=3)
+        self.assertEqual(asleep.await_count, 2)
+        sleep.assert_not_called()
+
+    @override_settings(BOOKING_LOCKING="optimistic")
+    def test_optimistic_booking_retries_database_is_locked(self):
+        locked = OperationalError("database is locked")
+        with mock.patch.object(Show, "_reserve_seats", side_effect=[locked, True]), \
+                mock.patch("bookings.models.time.sleep") as sleep:
+            booking = Booking.create_booking(self.user, self.show, "1")
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(Booking.objects.get().pk, booking.pk)  # the failed attempt rolled back
+        self.assertEqual(metrics.snapshot()["booking.lock_conflicts"], 1)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with mock.patch.object(Show, "_reserve_seats", side_effect=locked), \
+                mock.patch("bookings.models.time.sleep"):
+            with self.assertRaisesMessage(ValueError, "Show is busy"):
+                Booking.create_booking(self.user, self.show, "2", max_retries=3)
+            resp = client.post(f"/api/shows/{self.show.id}/book/", {"seat_number": "2"}, format="json")
+        self.assertEqual(resp.status_code, 400)  # not a 500
+
+    @override_settings(BOOKING_LOCKING="optimistic")
+    async def test_async_optimistic_booking_retries_database_is_locked(self):
+        with mock.patch.object(Show, "_reserve_seats", side_effect=[OperationalError("database is locked"), True]), \
+                mock.patch("bookings.models.asyncio.sleep") as asleep:
+            booking = await Booking.acreate_booking(self.user, self.show, "1")
+        self.assertEqual(asleep.await_count, 1)
+        self.assertEqual(booking.seat_number, "1")
+
+    def test_lock_conflict_is_retried_then_reported_busy(self):
+        class LockNotAvailable(Exception):
+            sqlstate = "55P03"
+
+        conflict = OperationalError("could not obtain lock on row in relation \"bookings_show\"")
+        conflict.__cause__ = LockNotAvailable()
+        with mock.patch.object(Booking, "_create_booking_locked", side_effect=conflict), \
+                mock.patch("bookings.models.time.sleep"):
+            with self.assertRaisesMessage(ValueError, "Show is busy"):
+                Booking.create_booking(self.user, self.show, "1", max_retries=3)
+        stats = metrics.snapshot()
+        self.assertEqual(stats["booking.lock_conflicts"], 3)
+        self.assertEqual(stats["booking.retries"], 2)
+
+    @override_settings(BOOKING_LOCKING="optimistic")
+    def test_group_booking_inserts_in_seat_order_and_reports_deadlocks_busy(self):
+        with CaptureQueriesContext(connection) as queries:
+            bookings = Booking.create_bookings(self.user, self.show, ["3", "1", "2"])
+        self.assertEqual([b.seat_number for b in bookings], ["3", "1", "2"])
+        insert = next(q["sql"] for q in queries if q["sql"].startswith("INSERT"))
+        self.assertLess(insert.index("'1'"), insert.index("'2'"))
+        self.assertLess(insert.index("'2'"), insert.index("'3'"))
+
+        class DeadlockDetected(Exception):
+            sqlstate = "40P01"
+
+        deadlock = OperationalError("deadlock detected")
+        deadlock.__cause__ = DeadlockDetected()
+        with mock.patch.object(Booking.objects, "bulk_create", side_effect=deadlock):
+            with self.assertRaisesMessage(ValueError, "Show is busy"):
+                Booking.create_bookings(self.user, self.show, ["4", "5"])
+        self.assertEqual(metrics.snapshot()["booking.lock_conflicts"], 1)
+
+    def test_other_operational_errors_propagate(self):
+        with mock.patch.object(Booking, "_create_booking_locked", side_effect=OperationalError("disk I/O error")), \
+                mock.patch("bookings.models.time.sleep") as sleep:
+            with self.assertRaises(OperationalError):
+                Booking.create_booking(self.user, self.show, "1")
+        sleep.assert_not_called()
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "needs PostgreSQL (DB_PROFILE=postgres)")
+class PostgresLockingTests(TransactionTestCase):
+    """NOWAIT / SKIP LOCKED against a real server: another connection holds the row lock."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="pg", password="Str0ngPass!123")
+        movie = Movie.objects.create(title="PG Movie", duration_minutes=100)
+        self.show = Show.objects.create(
+            movie=movie, screen_name="S1", date_time=timezone.now() + timedelta(days=1), total_seats=5
+        )
+
+    def _hold_lock(self, queryset):
+        locked, release = threading.Event(), threading.Event()
+
+        def holder():
+            try:
+                with transaction.atomic():
+                    list(queryset.select_for_update())
+                    locked.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        self.assertTrue(locked.wait(5))
+        return release, thread
+
+    def test_booking_fails_fast_on_locked_show(self):
+        release, thread = self._hold_lock(Show.objects.filter(pk=self.show.pk))
+        try:
+            started = time.monotonic()
+            with self.assertRaisesMessage(ValueError, "Show is busy"):
+                Booking.create_booking(self.user, self.show, "1", deadline=0.2)
+            self.assertLess(time.monotonic() - started, 1)
+            with self.assertRaisesMessage(ValueError, "Show is busy"):
+                Booking.create_bookings(self.user, self.show, ["2", "3"])
+        finally:
+            release.set()
+            thread.join()
+        Booking.create_booking(self.user, self.show, "1")
+        self.assertEqual(Show.objects.get(pk=self.show.pk).booked_count, 1)
+
+    def test_cancel_of_locked_booking_reports_busy(self):
+        booking = Booking.create_booking(self.user, self.show, "1")
+        client = APIClient()
+        client.force_authenticate(self.user)
+        release, thread = self._hold_lock(Booking.objects.filter(pk=booking.pk))
+        try:
+            # the lock holder may still roll back, so this is neither "cancelled" nor "already cancelled"
+            with self.assertRaises(BookingBusy):
+                booking.cancel()
+            resp = client.post(f"/api/bookings/{booking.pk}/cancel/")
+            self.assertEqual(resp.status_code, 409)
+            self.assertEqual(resp["Retry-After"], "1")
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, Status.BOOKED)
+        self.assertTrue(booking.cancel())
+        self.assertEqual(Show.objects.get(pk=self.show.pk).booked_count, 0)
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="async", email="async@a.com", password="Str0ngPass!123")
+        self.movie = Movie.objects.create(title="Async Movie", duration_minutes=100)
+        for i in range(3):
+            show = Show.objects.create(
+                movie=self.movie, screen_name=f"S{i}", date_time=timezone.now() + timedelta(days=1, hours=i),
+                total_seats=5,
+            )
+            Booking.create_booking(self.user, show, "1")
+        self.show = show
+        self.headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    async def test_movie_and_show_listings_match_sync_payloads(self):
+        client = AsyncClient()
+        resp = await client.get("/api/async/movies/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["results"], [{"id": self.movie.id, "title": "Async Movie", "duration_minutes": 100}])
+
+        resp = await client.get(f"/api/async/movies/{self.movie.id}/shows/?page_size=2&expand=movie")
+        body = resp.json()
+        self.assertEqual(body["count"], 3)
+        self.assertEqual(len(body["results"]), 2)
+        self.assertIn("page=2", body["next"])
+        self.assertEqual(body["results"][0]["movie"]["title"], "Async Movie")
+        self.assertEqual((await client.get("/api/async/movies/999999/shows/")).status_code, 404)
+
+    async def test_my_bookings_me_and_seat_map(self):
+        client = AsyncClient()
+        resp = await client.get("/api/async/my-bookings/", headers=self.headers)
+        self.assertEqual(resp.json()["count"], 3)
+        self.assertEqual((await client.get("/api/async/my-bookings/")).status_code, 401)
+
+        resp = await client.get("/api/async/auth/me/", headers=self.headers)
+        self.assertEqual(resp.json(), {"id": self.user.id, "username": "async", "email": "async@a.com"})
+
+        resp = await client.get(f"/api/async/shows/{self.show.id}/seats/")
+        self.assertEqual(decode_seats(resp.json()["booked"], 5), {1})
+
+
+class BenchBookingCommandTests(TransactionTestCase):
+    def test_reports_json_and_cleans_up(self):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.json")
+            call_command(
+                "bench_booking", "--workers", "2", "--seats", "20", "--attempts", "30",
+                "--locking", "optimistic", "--json", path, stdout=out,
+            )
+            with open(path) as fh:
+                results = json.load(fh)
+        self.assertEqual(results["summary"]["requests"], 30)
+        self.assertEqual(sum(results["outcomes"].values()), 30)
+        self.assertLessEqual(results["outcomes"].get("booked", 0), 20)
+        self.assertTrue(results["consistent"])
+        self.assertIn("p99", out.getvalue())
+        self.assertFalse(Movie.objects.exists())
+
+
+class BenchHelperTests(TestCase):
+    def test_percentiles_and_summary(self):
+        values = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 0.05)
+        self.assertEqual(percentile(values, 99), 0.099)
+        summary = summarize(values, 2.0)
+        self.assertEqual(summary["requests"], 100)
+        self.assertEqual(summary["throughput_per_s"], 50.0)
+        self.assertEqual(summary["p95_ms"], 95.0)
+
+
+class PerformanceInstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        reset_listing_cache_stats()
+        Movie.objects.create(title="Timed Movie", duration_minutes=100)
+
+    def test_server_timing_header_and_admin_stats(self):
+        client = APIClient()
+        resp = client.get("/api/movies/")
+        timing = resp["Server-Timing"]
+        for part in ("db;dur=", 'desc="2 queries"', "render;dur=", "total;dur="):
+            self.assertIn(part, timing)
+
+        self.assertEqual(client.get("/api/_stats/").status_code, 401)
+        client.force_authenticate(User.objects.create_user(username="ops", password="x", is_staff=True))
+        resp = client.get("/api/_stats/")
+        self.assertEqual(resp.status_code, 200)
+        movies = resp.data["endpoints"]["movies-list"]
+        self.assertEqual(movies["total"]["count"], 1)
+        self.assertIn("db", movies)
+        self.assertEqual(resp.data["counters"]["http.movies-list.queries"], 2)
+        self.assertEqual(resp.data["listing_cache"]["movies"]["miss"], 1)
+
+    async def test_asgi_requests_count_queries(self):
+        client = AsyncClient()
+        for url in ("/api/movies/", "/api/async/movies/"):  # a sync DRF view and a native async one
+            with self.subTest(url=url):
+                resp = await client.get(url)
+                self.assertEqual(resp.status_code, 200)
+                self.assertIn("db;dur=", resp["Server-Timing"])
+                self.assertNotIn('desc="0 queries"', resp["Server-Timing"])
+
+    @override_settings(PERF_INSTRUMENTATION=False)
+    def test_disabled_middleware_is_dropped(self):
+        resp = APIClient().get("/api/movies/")
+        self.assertNotIn("Server-Timing", resp)
+        self.assertEqual(metrics.histograms.report(), {})
+
+    def test_rolling_window_forgets_old_observations(self):
+        hist = metrics.RollingHistograms(window_seconds=60)
+        hist.observe("x", "total", 3)
+        self.assertEqual(hist.report()["x"]["total"]["p50_ms"], 5.0)
+        with mock.patch("bookings.metrics.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertEqual(hist.report()["x"]["total"]["count"], 1)  # previous window still reported
+        with mock.patch("bookings.metrics.time.monotonic", return_value=time.monotonic() + 200):
+            self.assertEqual(hist.report(), {})
+
+
+class SqlitePragmaHookTests(TestCase):
+    @override_settings(SQLITE_PRAGMAS={"busy_timeout": 1234, "cache_size": -4096})
+    def test_connection_hook_applies_configured_pragmas(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite only")
+        apply_sqlite_pragmas(sender=type(connection), connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 1234)
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], -4096)
@@ -1,25 +1,51 @@
 from django.urls import path
+
+from . import async_views
 from .views import (
     MovieListView,
     ShowByMovieListView,
+    AvailableShowListView,
+    SeatMapView,
+    BestSeatsView,
     BookSeatView,
+    BookBatchView,
+    HoldSeatView,
     CancelBookingView,
     MyBookingsView,
+    BookingExportView,
     SignupView,
     MeView,
+    StatsView,
 )
 
 urlpatterns = [
     # Movies & shows
     path("movies/", MovieListView.as_view(), name="movies-list"),
     path("movies/<int:movie_id>/shows/", ShowByMovieListView.as_view(), name="movie-shows"),
+    path("shows/available/", AvailableShowListView.as_view(), name="available-shows"),
+    path("shows/<int:id>/seats/", SeatMapView.as_view(), name="seat-map"),
+    path("shows/<int:id>/best-seats/", BestSeatsView.as_view(), name="best-seats"),
 
     # Booking actions
     path("shows/<int:id>/book/", BookSeatView.as_view(), name="book-seat"),
+    path("shows/<int:id>/book-batch/", BookBatchView.as_view(), name="book-batch"),
+    path("shows/<int:id>/hold/", HoldSeatView.as_view(), name="hold-seat"),
     path("bookings/<int:id>/cancel/", CancelBookingView.as_view(), name="cancel-booking"),
     path("my-bookings/", MyBookingsView.as_view(), name="my-bookings"),
+    path("bookings/export/", BookingExportView.as_view(), name="booking-export"),
+
+    # Native async variants for ASGI deployments
+    path("async/movies/", async_views.movie_list, name="async-movies-list"),
+    path("async/movies/<int:movie_id>/shows/", async_views.movie_shows, name="async-movie-shows"),
+    path("async/shows/<int:id>/seats/", async_views.seat_map, name="async-seat-map"),
+    path("async/shows/<int:id>/book/", async_views.book_seat, name="async-book-seat"),
+    path("async/my-bookings/", async_views.my_bookings, name="async-my-bookings"),
+    path("async/auth/me/", async_views.me, name="async-me"),
 
     # Auth endpoints (served from bookings app)
     path("auth/signup/", SignupView.as_view(), name="signup"),
     path("auth/me/", MeView.as_view(), name="me"),
+
+    # Ops
+    path("_stats/", StatsView.as_view(), name="stats"),
 ]
@@ -1,29 +1,51 @@
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.http import Http404, StreamingHttpResponse
+from django.db.models import F
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
-from rest_framework import generics, permissions, pagination, status, serializers
+from rest_framework import generics, permissions, status, serializers
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from .models import Movie, Show, Booking
+from . import metrics
+from .authentication import IsActiveStaff
+from .export import CONTENT_TYPES, EXPORT_FORMATS, iter_export
+from .fastpath import FastListMixin
+from .listing_cache import (
+    AVAILABILITY_CACHE_TIMEOUT,
+    CachedListMixin,
+    availability_namespace,
+    listing_cache_stats,
+    movies_namespace,
+    shows_namespace,
+)
+from .models import Movie, Show, Booking, BookingArchive, BookingBusy, SeatHold
+from .pagination import DefaultPagination, BookingHistoryPagination, ShowSchedulePagination
+from .seatmap import find_best_seats, get_seat_map, invalidate_seat_map, seat_positions
 from .serializers import (
     UserSignupSerializer,
     MovieSerializer,
     ShowSerializer,
+    AvailableShowSerializer,
     BookingSerializer,
+    SeatHoldSerializer,
+    request_paths,
+    select_expanded,
 )
 from rest_framework import serializers
 
 
-# Pagination
-class DefaultPagination(pagination.PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "page_size"
-
-
 User = get_user_model()
 
+# ?fields= / ?expand= (see FlexFieldsMixin in serializers.py)
+FLEX_FIELDS_PARAMETERS = [
+    OpenApiParameter(name="fields", type=str, required=False, description="Comma-separated fields to return, e.g. id,show.date_time"),
+    OpenApiParameter(name="expand", type=str, required=False, description="Nest related objects instead of ids, e.g. show,show.movie"),
+]
+
 # add this near other imports and serializer definitions
 class MeSerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
@@ -65,6 +87,7 @@ class SignupView(generics.CreateAPIView):
 class MeView(generics.GenericAPIView):
     """
     Simple protected endpoint to verify JWT; returns current user info.
+    With ClaimsJWTAuthentication it is answered from the token's claims — no database query.
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -73,16 +96,19 @@ class MeView(generics.GenericAPIView):
         return Response({"id": u.id, "username": u.username, "email": u.email})
 
 
-@extend_schema(tags=["Movies"])
-class MovieListView(generics.ListAPIView):
+@extend_schema(tags=["Movies"], parameters=FLEX_FIELDS_PARAMETERS)
+class MovieListView(CachedListMixin, FastListMixin, generics.ListAPIView):
     """
-    Public: list all movies (paginated, ordered by title).
+    Public: list all movies (paginated, ordered by title). Served from the listing cache.
     """
     queryset = Movie.objects.all().order_by("title")
     serializer_class = MovieSerializer
     permission_classes = [permissions.AllowAny]
     pagination_class = DefaultPagination
 
+    def get_cache_namespace(self):
+        return movies_namespace()
+
 
 @extend_schema(
     tags=["Shows"],
@@ -93,34 +119,156 @@ class MovieListView(generics.ListAPIView):
             required=False,
             type=str,
         ),
+        *FLEX_FIELDS_PARAMETERS,
     ],
 )
-class ShowByMovieListView(generics.ListAPIView):
+class ShowByMovieListView(CachedListMixin, FastListMixin, generics.ListAPIView):
     """
-    Public: list shows for a given movie, soonest first.
+    Public: list shows for a given movie, soonest first. Served from the listing cache.
     Optional filter: ?from=<ISO datetime> to only return upcoming shows.
+    Cursor-paginated on (date_time, id); pass ?page=N for page numbers instead.
     """
     serializer_class = ShowSerializer
     permission_classes = [permissions.AllowAny]
-    pagination_class = DefaultPagination
+    pagination_class = ShowSchedulePagination
+
+    def get_cache_namespace(self):
+        return shows_namespace(self.kwargs.get("movie_id"))
 
     def get_queryset(self):
         movie_id = self.kwargs.get("movie_id")
         get_object_or_404(Movie, id=movie_id)  # ensures 404 if movie doesn't exist
-        qs = Show.objects.filter(movie_id=movie_id)
+        qs = select_expanded(Show.objects.filter(movie_id=movie_id), ShowSerializer, request_paths(self.request, "expand"))
         dt_from = self.request.query_params.get("from")
         if dt_from:
             from django.utils.dateparse import parse_datetime
             parsed = parse_datetime(dt_from)
             if parsed:
                 qs = qs.filter(date_time__gte=parsed)
-        return qs.order_by("date_time")
+        return qs.order_by("date_time", "id")
 
+class AvailabilityQuerySerializer(serializers.Serializer):
+    min_free = serializers.IntegerField(default=1, min_value=1)
+    movie = serializers.IntegerField(required=False, min_value=1)
+    to = serializers.DateTimeField(required=False, help_text="Exclusive")
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # "from" is a keyword, so it can't be a class attribute
+        self.fields["from"] = serializers.DateTimeField(required=False, help_text="Default: now")
 
-class BookSeatRequestSerializer(serializers.Serializer):
+
+@extend_schema(tags=["Shows"], parameters=[AvailabilityQuerySerializer, *FLEX_FIELDS_PARAMETERS])
+class AvailableShowListView(CachedListMixin, FastListMixin, generics.ListAPIView):
+    """
+    Public: upcoming shows (any movie) with at least ?min_free=N free seats, soonest first,
+    each with its free_seats count. One query: free seats come from the denormalized
+    booked_count, filtered and ordered on the (date_time, id) index.
+    Cached for AVAILABILITY_CACHE_TIMEOUT seconds, so counts can lag bookings by that much.
+    """
+    serializer_class = AvailableShowSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = ShowSchedulePagination
+    cache_timeout = AVAILABILITY_CACHE_TIMEOUT
+    conditional_get = False  # free_seats changes without a version bump
+
+    def get_cache_namespace(self):
+        return availability_namespace()
+
+    def get_queryset(self):
+        params = AvailabilityQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        qs = Show.objects.filter(
+            date_time__gte=params.get("from") or timezone.now(),
+            booked_count__lte=F("total_seats") - params["min_free"],
+        )
+        if "to" in params:
+            qs = qs.filter(date_time__lt=params["to"])
+        if "movie" in params:
+            qs = qs.filter(movie_id=params["movie"])
+        qs = select_expanded(qs, AvailableShowSerializer, request_paths(self.request, "expand"))
+        return qs.annotate(free_seats=F("total_seats") - F("booked_count")).order_by("date_time", "id")
+
+
+class SeatLayoutMapSerializer(serializers.Serializer):
+    rows = serializers.IntegerField()
+    seats_per_row = serializers.IntegerField()
+    blocked = serializers.CharField(help_text="Same encoding as booked")
+
+
+class SeatMapSerializer(serializers.Serializer):
+    show = serializers.IntegerField()
+    total_seats = serializers.IntegerField()
+    booked_count = serializers.IntegerField()
+    encoding = serializers.CharField(
+        help_text="bitset-base64: seat N is bit N-1, most significant bit first. "
+        "With a layout, seat <row letter><n> is N = row index * seats_per_row + n."
+    )
+    booked = serializers.CharField()
+    layout = SeatLayoutMapSerializer(required=False, help_text="Only for shows with a seat layout")
+
+
+@extend_schema(tags=["Shows"], responses={200: SeatMapSerializer})
+class SeatMapView(APIView):
+    """
+    Public: seat occupancy for a show as a compact bitset.
+    Served from cache; rebuilt from one query after a booking or cancellation.
+    """
+    authentication_classes = []  # public, and a cached read shouldn't pay for a user lookup
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, id):
+        seat_map = get_seat_map(id)
+        if seat_map is None:
+            raise Http404
+        return Response(seat_map)
+
+
+class HoldSeatRequestSerializer(serializers.Serializer):
     seat_number = serializers.CharField(max_length=10)
 
+
+@extend_schema(request=HoldSeatRequestSerializer, responses={201: SeatHoldSerializer}, parameters=FLEX_FIELDS_PARAMETERS)
+class HoldSeatView(APIView):
+    """
+    Hold a seat for a few minutes while checking out; book it with the returned token.
+    """
+    serializer_class = HoldSeatRequestSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, id):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        show = get_object_or_404(Show.objects.select_related("layout"), pk=id)
+
+        try:
+            hold = SeatHold.create_hold(user=request.user, show=show, seat_number=serializer.validated_data["seat_number"])
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(SeatHoldSerializer(hold, context={"request": request}).data, status=status.HTTP_201_CREATED)
+
+
+def _show_for_booking_response(request):
+    # the new bookings reuse this show instance, so join whatever ?expand=show.<...> will nest,
+    # and the seat layout that validates the seat numbers
+    shows = Show.objects.select_related("layout")
+    return select_expanded(shows, ShowSerializer, request_paths(request, "expand").get("show", {}))
+
+
+class BookSeatRequestSerializer(serializers.Serializer):
+    seat_number = serializers.CharField(max_length=10, required=False)
+    hold_token = serializers.UUIDField(required=False, help_text="Token from shows/<id>/hold/; books the held seat")
+
+    def validate(self, attrs):
+        if not attrs.get("seat_number") and not attrs.get("hold_token"):
+            raise serializers.ValidationError("seat_number or hold_token required")
+        return attrs
+
+@extend_schema(parameters=FLEX_FIELDS_PARAMETERS)
 class BookSeatView(APIView):
     serializer_class = BookSeatRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -128,44 +276,222 @@ class BookSeatView(APIView):
     def post(self, request, id):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        seat_number = request.data.get("seat_number")
-        if not seat_number:
-            return Response({"detail": "seat_number required"}, status=status.HTTP_400_BAD_REQUEST)
+        seat_number = serializer.validated_data.get("seat_number")
+        hold_token = serializer.validated_data.get("hold_token")
 
-        show = get_object_or_404(Show, pk=id)
-
-        # Basic validation: seat format/length
-        if len(seat_number) > 10:
-            return Response({"detail": "invalid seat_number"}, status=status.HTTP_400_BAD_REQUEST)
+        show = get_object_or_404(_show_for_booking_response(request), pk=id)
 
         try:
-            booking = Booking.create_booking(user=request.user, show=show, seat_number=seat_number)
+            if hold_token:
+                booking = Booking.create_booking_from_hold(user=request.user, show=show, hold_token=hold_token)
+            else:
+                booking = Booking.create_booking(user=request.user, show=show, seat_number=seat_number)
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = BookingSerializer(booking)
+        serializer = BookingSerializer(booking, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class BookBatchRequestSerializer(serializers.Serializer):
+    seat_numbers = serializers.ListField(
+        child=serializers.CharField(max_length=10),
+        min_length=1,
+        max_length=10,
+    )
+
+
+@extend_schema(
+    request=BookBatchRequestSerializer, responses={201: BookingSerializer(many=True)}, parameters=FLEX_FIELDS_PARAMETERS
+)
+class BookBatchView(APIView):
+    """
+    Book several seats of one show atomically — either all seats are booked or none.
+    """
+    serializer_class = BookBatchRequestSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, id):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        show = get_object_or_404(_show_for_booking_response(request), pk=id)
+
+        try:
+            bookings = Booking.create_bookings(
+                user=request.user, show=show, seat_numbers=serializer.validated_data["seat_numbers"]
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            BookingSerializer(bookings, many=True, context={"request": request}).data, status=status.HTTP_201_CREATED
+        )
+
+
+class BestSeatsQuerySerializer(serializers.Serializer):
+    n = serializers.IntegerField(min_value=1, max_value=10, help_text="Adjacent seats wanted (same cap as book-batch)")
+    row = serializers.FloatField(
+        required=False, min_value=0, max_value=1, help_text="Preferred row, 0 = front, 1 = back. Default: BEST_SEATS_IDEAL_ROW"
+    )
+
+
+class BestSeatsSerializer(serializers.Serializer):
+    show = serializers.IntegerField()
+    n = serializers.IntegerField()
+    seats = serializers.ListField(child=serializers.CharField(), help_text="Empty if no row has n adjacent free seats")
+
+
+@extend_schema(tags=["Shows"])
+class BestSeatsView(APIView):
+    """
+    GET: the best n adjacent free seats of a show, searched in the cached seat map (no query
+    once it is cached). Seats on hold aren't in the map, so a suggestion may be held.
+    POST (auth): find and book them as one batch, skipping held seats. A suggestion that a
+    concurrent booking or hold took first is searched again, up to book_attempts times.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    book_attempts = 3
+
+    @extend_schema(parameters=[BestSeatsQuerySerializer], responses={200: BestSeatsSerializer})
+    def get(self, request, id):
+        params = self._params(request.query_params)
+        seat_map = get_seat_map(id)
+        if seat_map is None:
+            raise Http404
+        return Response({"show": id, "n": params["n"], "seats": find_best_seats(seat_map, **params)})
+
+    @extend_schema(
+        request=BestSeatsQuerySerializer, responses={201: BookingSerializer(many=True)}, parameters=FLEX_FIELDS_PARAMETERS
+    )
+    def post(self, request, id):
+        params = self._params(request.data)
+        show = get_object_or_404(_show_for_booking_response(request), pk=id)
+        for attempt in range(1, self.book_attempts + 1):
+            seat_map = get_seat_map(id)
+            held = SeatHold.objects.filter(show=show, expires_at__gt=timezone.now()).exclude(user=request.user)
+            seats = find_best_seats(
+                seat_map, taken=seat_positions(seat_map, held.values_list("seat_number", flat=True)), **params
+            )
+            if not seats:
+                return Response(
+                    {"detail": f"No {params['n']} adjacent seats are free"}, status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                bookings = Booking.create_bookings(user=request.user, show=show, seat_numbers=seats)
+                break
+            except ValueError as e:
+                if not str(e).startswith(("Seat already booked", "Seat is on hold")) or attempt == self.book_attempts:
+                    return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                invalidate_seat_map(id)  # the map was older than a booking that just committed
+        return Response(
+            BookingSerializer(bookings, many=True, context={"request": request}).data, status=status.HTTP_201_CREATED
+        )
+
+    @staticmethod
+    def _params(data):
+        params = BestSeatsQuerySerializer(data=data)
+        params.is_valid(raise_exception=True)
+        return {
+            "n": params.validated_data["n"],
+            "ideal_row": params.validated_data.get("row", getattr(settings, "BEST_SEATS_IDEAL_ROW", 0.6)),
+            "row_weight": getattr(settings, "BEST_SEATS_ROW_WEIGHT", 1.0),
+        }
+
+
 class CancelBookingView(APIView):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, id):
         booking = get_object_or_404(Booking, pk=id)
-        if booking.user != request.user:
+        if booking.user_id != request.user.pk:
             return Response({"detail": "not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
-        changed = booking.cancel()
+        try:
+            changed = booking.cancel()
+        except Booking.DoesNotExist:  # archived in the meantime
+            raise Http404
+        except BookingBusy as e:  # locked by a concurrent cancel or the archiver; its state isn't known yet
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT, headers={"Retry-After": "1"})
         if not changed:
             return Response({"detail": "already cancelled"}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({"detail": "cancelled"}, status=status.HTTP_200_OK)
 
 
-class MyBookingsView(generics.ListAPIView):
+class MyBookingsQuerySerializer(serializers.Serializer):
+    history = serializers.BooleanField(
+        default=False, help_text="Also list archived bookings (see archive_bookings); pages by number"
+    )
+
+
+@extend_schema(parameters=[MyBookingsQuerySerializer, *FLEX_FIELDS_PARAMETERS])
+class MyBookingsView(FastListMixin, generics.ListAPIView):
+    """
+    The current user's bookings, newest first.
+    Cursor-paginated on (created_at, id); pass ?page=N for page numbers instead.
+    ?history=true adds archived bookings (a UNION with BookingArchive), paginated by page number.
+    """
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingHistoryPagination
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user).order_by("-created_at")
+        qs = Booking.objects.filter(user=self.request.user).order_by("-created_at", "-id")
+        return select_expanded(qs, BookingSerializer, request_paths(self.request, "expand"))
+
+    def get_rows(self, paths):
+        rows = super().get_rows(paths)
+        params = MyBookingsQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        if not params.validated_data["history"]:
+            return rows
+        # same column names as Booking, so the same values() paths work on both
+        archived = BookingArchive.objects.filter(user=self.request.user).values(*paths)
+        return rows.order_by().union(archived.order_by(), all=True)
+
+
+class BookingExportQuerySerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default="csv")
+    show = serializers.IntegerField(required=False, min_value=1)
+    movie = serializers.IntegerField(required=False, min_value=1)
+    created_from = serializers.DateTimeField(required=False)
+    created_to = serializers.DateTimeField(required=False, help_text="Exclusive")
+    include_archived = serializers.BooleanField(default=False, help_text="Also export archived bookings")
+
+
+@extend_schema(tags=["Admin"], parameters=[BookingExportQuerySerializer], responses={200: str})
+class BookingExportView(APIView):
+    """
+    Admin only: every booking matching the filters as CSV (default) or JSON Lines (?output=jsonl),
+    streamed straight from a values() iterator — memory stays flat however many rows match.
+    ?include_archived=true adds the bookings moved to BookingArchive.
+    """
+    permission_classes = [IsActiveStaff]
+
+    def get(self, request):
+        params = BookingExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        fmt = filters.pop("output")
+        response = StreamingHttpResponse(iter_export(fmt, **filters), content_type=CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="bookings.{fmt}"'
+        return response
+
+
+@extend_schema(tags=["Admin"], responses={200: dict})
+class StatsView(APIView):
+    """
+    Admin only: rolling per-endpoint latency histograms (total / db / render, in ms)
+    from PerformanceMiddleware, plus this process's counters and listing-cache hit rates.
+    """
+    permission_classes = [IsActiveStaff]
+
+    def get(self, request):
+        return Response({
+            "window_seconds": metrics.histograms.window_seconds,
+            "endpoints": metrics.histograms.report(),
+            "counters": metrics.snapshot(),
+            "listing_cache": listing_cache_stats(),
+        })